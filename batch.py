@@ -0,0 +1,143 @@
+"""Procesamiento por lotes de vídeos o carpetas de imágenes ya grabados, en paralelo y sin Qt.
+
+Cada archivo lo procesa un proceso distinto, fotograma a fotograma: se lee, pasa por
+el mismo ``FramePipeline`` que la vista previa y se escribe, así que la memoria no
+depende de la duración del vídeo.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import cv2
+
+from filters import FILTERS
+from headless import build_pipeline
+from recorder import AsyncVideoWriter
+from settings import VIDEO_DIR
+from sources import DEFAULT_FPS, expand_inputs, open_source
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("inputs", nargs="+", help="Archivos de vídeo, carpetas de vídeos o carpetas de imágenes")
+    parser.add_argument("--output", type=Path, default=None, help="Carpeta de salida (por defecto VIDEO_DIR)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Archivos procesados a la vez")
+    parser.add_argument("--filter", default="Normal", help=f"Filtro o cadena A+B ({', '.join(FILTERS)})")
+    parser.add_argument("--zoom", type=int, default=100, help="Zoom digital en porcentaje (100-300)")
+    parser.add_argument("--faces", action="store_true", help="Marcar rostros con el clasificador Haar")
+    parser.add_argument("--face-every", type=int, default=3)
+    parser.add_argument("--face-width", type=int, default=480)
+    parser.add_argument("--source-fps", type=float, default=DEFAULT_FPS, help="fps nominales de una carpeta de imágenes")
+    parser.add_argument("--suffix", default="-procesado", help="Sufijo añadido al nombre de cada salida")
+
+
+def output_path(spec: str, directory: Path, suffix: str) -> Path:
+    path = Path(spec)
+    return directory / f"{path.stem if path.suffix else path.name}{suffix}.avi"
+
+
+def output_paths(inputs: list[str], directory: Path, suffix: str) -> dict[str, Path]:
+    """Una salida distinta por entrada: ``a/clip.mp4`` y ``b/clip.mov`` no comparten ``.avi``.
+
+    Ante una colisión se antepone la carpeta de origen y, si aún choca, un contador.
+    """
+    targets: dict[str, Path] = {}
+    taken: set[Path] = set()
+    for spec in inputs:
+        target = output_path(spec, directory, suffix)
+        if target in taken:
+            parent = Path(spec).resolve().parent.name
+            target = target.with_name(f"{parent}-{target.name}") if parent else target
+        number = 2
+        stem = target.stem
+        while target in taken:
+            target = target.with_name(f"{stem}-{number}{target.suffix}")
+            number += 1
+        taken.add(target)
+        targets[spec] = target
+    return targets
+
+
+def _init_worker(threads: int) -> None:
+    # Varios archivos a la vez ya ocupan los núcleos; OpenCV no debe repartir además cada fotograma.
+    cv2.setNumThreads(threads)
+
+
+def process_file(spec: str, args: argparse.Namespace, target: Path | None = None) -> dict:
+    source = open_source(spec, fps=args.source_fps)
+    if not source.isOpened():
+        return {"input": spec, "error": "no se pudo abrir"}
+    target = target or output_path(spec, args.output or VIDEO_DIR, args.suffix)
+    pipeline = build_pipeline(args)
+    writer: AsyncVideoWriter | None = None
+    frames = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            ok, frame = source.read()
+            if not ok:
+                break
+            frame = pipeline.process(frame, source.position)
+            if writer is None:
+                height, width = frame.shape[:2]
+                writer = AsyncVideoWriter(target, (width, height), round(source.fps) or 24, policy="block", pace=False)
+                if not writer.open():
+                    return {"input": spec, "error": f"no se pudo crear {target}"}
+            # ``write`` copia el fotograma a la cola: su búfer puede volver al pool ya.
+            writer.write(frame, source.position)
+            pipeline.release(frame)
+            frames += 1
+    finally:
+        source.release()
+        if writer is not None:
+            writer.close(wait=True)
+    elapsed = time.perf_counter() - started
+    if writer is not None and writer.error:
+        return {"input": spec, "error": writer.error}
+    return {"input": spec, "output": str(target), "frames": frames, "seconds": round(elapsed, 3),
+            "fps": round(frames / elapsed, 1) if elapsed else 0.0}
+
+
+def run(args: argparse.Namespace) -> int:
+    inputs = expand_inputs(args.inputs)
+    (args.output or VIDEO_DIR).mkdir(parents=True, exist_ok=True)
+    jobs = max(1, min(args.jobs, len(inputs)))
+    started = time.perf_counter()
+    results = []
+    # Con un solo proceso OpenCV conserva su reparto interno por defecto.
+    options = {"initializer": _init_worker, "initargs": (1,)} if jobs > 1 else {}
+    with ProcessPoolExecutor(max_workers=jobs, **options) as pool:
+        # Los nombres se reparten aquí: dos procesos nunca escriben en el mismo archivo.
+        targets = output_paths(inputs, args.output or VIDEO_DIR, args.suffix)
+        futures = {pool.submit(process_file, spec, args, targets[spec]): spec for spec in inputs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as exc:  # Un archivo corrupto no debe tumbar el lote.
+                result = {"input": futures[future], "error": str(exc)}
+            results.append(result)
+            if "error" in result:
+                print(f"ERROR {result['input']}: {result['error']}", file=sys.stderr)
+            else:
+                print(f"{result['input']} -> {result['output']}: {result['frames']} fotogramas en "
+                      f"{result['seconds']:.2f} s ({result['fps']:.1f} fps)")
+    elapsed = time.perf_counter() - started
+    total = sum(result.get("frames", 0) for result in results)
+    failed = sum(1 for result in results if "error" in result)
+    print(f"Lote: {len(results) - failed}/{len(results)} archivos, {total} fotogramas en {elapsed:.2f} s "
+          f"({total / elapsed if elapsed else 0:.1f} fps con {jobs} procesos)")
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Procesar vídeos grabados con los filtros de la cámara")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,338 @@
+"""Banco de pruebas del camino caliente: zoom, filtros, detección y el pipeline completo sin Qt.
+
+Genera fotogramas sintéticos para cada entrada de ``RESOLUTIONS``, mide fps, latencia
+p50/p99 y bytes reservados por fotograma, guarda el resultado en JSON y puede compararlo
+con una ejecución anterior para fallar ante regresiones. ``--memory`` mide el pico de
+RSS por resolución en subprocesos, con y sin ``BufferPool``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from bufferpool import BufferPool
+from detection import FaceDetector, load_face_cascade
+from filters import FILTERS, apply_filter
+from processing import FramePipeline, zoom_frame
+from procpool import ProcessPool
+from settings import RESOLUTIONS
+
+ZOOM_LEVELS = (100, 150, 200, 300)
+PREVIEW_BOUND = (960, 600)
+STARTUP_BUDGET_MS = 1000.0
+GUI_MODULES = ("PyQt6", "leviathan_ui")
+
+
+def synthetic_frame(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Degradado con ruido y bloques: comprime y se filtra como una escena real, no como ruido puro."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width)),
+                     (np.broadcast_to(x, (height, width)) + y) / 2], axis=2)
+    frame = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+    for index in range(6):
+        x0, y0 = int(rng.integers(0, width - width // 6)), int(rng.integers(0, height - height // 6))
+        cv2.rectangle(frame, (x0, y0), (x0 + width // 8, y0 + height // 8), (40 * index, 200, 255 - 40 * index), -1)
+    return frame
+
+
+def percentile(samples: list[float], q: float) -> float:
+    return float(np.percentile(samples, q)) if samples else 0.0
+
+
+def measure(func, frame: np.ndarray, repeat: int, warmup: int = 3) -> dict:
+    for _ in range(warmup):
+        func(frame)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(frame)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    # Pasada aparte con tracemalloc: numpy registra sus búferes (también los creados por cv2).
+    tracemalloc.start()
+    allocated = []
+    for _ in range(max(3, repeat // 10)):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        func(frame)
+        allocated.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+    total = sum(samples)
+    return {
+        "fps": round(1000.0 * len(samples) / total, 2) if total else 0.0,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "alloc_bytes_per_frame": int(np.median(allocated)),
+    }
+
+
+def pipeline_case(detector: FaceDetector | None, filter_name: str, zoom: int, pooled: bool = False):
+    """Como ``_read_frame``; con ``pooled`` la lectura, el zoom y el filtro reutilizan búferes
+    que vuelven al pool con ``release`` al terminar el fotograma, igual que en la GUI."""
+    pool = BufferPool() if pooled else None
+    pipeline = FramePipeline(zoom, filter_name, detector, detect=detector is not None, sync_detection=True,
+                             pool=pool)
+    preview = np.empty((1, 1, 3), np.uint8)
+
+    def run(frame: np.ndarray) -> None:
+        nonlocal preview
+        if pool is not None:
+            # Equivale a ``cap.read(image)``: el decodificador escribe en un búfer existente.
+            captured = pool.like(frame)
+            np.copyto(captured, frame)
+            last_frame = pipeline.process(captured)
+        else:
+            last_frame = pipeline.process(frame.copy()).copy()
+        out = last_frame
+        height, width = out.shape[:2]
+        scale = min(PREVIEW_BOUND[0] / width, PREVIEW_BOUND[1] / height)
+        size = (int(width * scale), int(height * scale))
+        if preview.shape[:2] != (size[1], size[0]):
+            preview = np.empty((size[1], size[0], 3), np.uint8)
+        cv2.resize(last_frame, size, dst=preview, interpolation=cv2.INTER_LINEAR)
+        if pool is not None:
+            pool.release(captured)
+            pool.release(last_frame)
+    return run
+
+
+def run_suite(resolutions=RESOLUTIONS, repeat: int = 50, filters=FILTERS) -> dict:
+    cascade = load_face_cascade()
+    detector = FaceDetector(cascade) if cascade is not None else None
+    cases = {}
+    for width, height in resolutions:
+        frame = synthetic_frame(width, height)
+        tag = f"{width}x{height}"
+        for percent in ZOOM_LEVELS:
+            cases[f"zoom/{percent}/{tag}"] = measure(lambda f, p=percent: zoom_frame(f, p), frame, repeat)
+        for name in filters:
+            cases[f"filter/{name}/{tag}"] = measure(lambda f, n=name: apply_filter(f, n), frame, repeat)
+        if detector is not None:
+            cases[f"detect/haar/{tag}"] = measure(detector.detect, frame, max(5, repeat // 5))
+        cases[f"pipeline/Sepia+zoom150/{tag}"] = measure(pipeline_case(None, "Sepia", 150), frame, repeat)
+        cases[f"pipeline/Sepia+zoom150+pool/{tag}"] = measure(pipeline_case(None, "Sepia", 150, pooled=True),
+                                                              frame, repeat)
+        if detector is not None:
+            cases[f"pipeline/Sepia+zoom150+faces/{tag}"] = measure(pipeline_case(detector, "Sepia", 150), frame, repeat)
+    return {"meta": environment(detector is not None), "cases": cases}
+
+
+def pool_scaling(width: int, height: int, max_workers: int, frames: int = 120, filter_name: str = "Sepia",
+                 zoom: int = 150) -> list[dict]:
+    """Fotogramas por segundo de ``ProcessPool`` con 1..``max_workers`` procesos (sin contar el arranque)."""
+    frame = synthetic_frame(width, height)
+    rows = []
+
+    def consume(pool: ProcessPool, results: list) -> int:
+        # Cada resultado es una vista que ocupa su ranura hasta devolverla.
+        for _, _, view in results:
+            pool.release(view)
+        return len(results)
+
+    for workers in range(1, max_workers + 1):
+        pool = ProcessPool(frame.shape, workers).start()
+        try:
+            for _ in range(pool.slots):
+                pool.submit(frame, 0.0, zoom, filter_name)
+            consume(pool, pool.drain(60.0))
+            done = 0
+            start = time.perf_counter()
+            for index in range(frames):
+                while pool.submit(frame, float(index), zoom, filter_name) is None:
+                    done += consume(pool, pool.ready(0.05))
+                done += consume(pool, pool.ready())
+            done += consume(pool, pool.drain(60.0))
+            elapsed = time.perf_counter() - start
+        finally:
+            pool.close()
+        rows.append({"workers": workers, "fps": round(done / elapsed, 2) if elapsed else 0.0,
+                     "latency_ms": round(pool.latency_ms, 3)})
+    return rows
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _peak_rss_bytes() -> int:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def memory_child(width: int, height: int, frames: int, pooled: bool) -> dict:
+    """Ejecuta el pipeline ``frames`` veces y devuelve el pico de RSS y cuánto creció en la segunda mitad."""
+    # El degradado a tamaño completo pasa por float64 y dominaría el pico: se genera pequeño y se amplía.
+    frame = cv2.resize(synthetic_frame(max(16, width // 8), max(16, height // 8)), (width, height))
+    run = pipeline_case(None, "Sepia", 150, pooled)
+    halfway = 0
+    for index in range(frames):
+        run(frame)
+        if index == frames // 2:
+            halfway = _rss_bytes()
+    return {"peak_rss_mb": round(_peak_rss_bytes() / 2 ** 20, 1),
+            "growth_mb": round((_rss_bytes() - halfway) / 2 ** 20, 1) if halfway else None}
+
+
+def memory_report(resolutions, frames: int = 300) -> dict:
+    """Cada caso en un proceso nuevo: el pico de RSS de uno no contamina al siguiente."""
+    script = Path(__file__).resolve()
+    results = {}
+    for width, height in resolutions:
+        for pooled in (False, True):
+            command = [sys.executable, str(script), "--memory-child", f"{width}x{height}", "--repeat", str(frames)]
+            if pooled:
+                command.append("--pooled")
+            done = subprocess.run(command, capture_output=True, text=True)
+            key = f"memory/{'pool' if pooled else 'alloc'}/{width}x{height}"
+            try:
+                results[key] = json.loads(done.stdout.strip().splitlines()[-1])
+            except (IndexError, ValueError):
+                results[key] = {"error": done.stderr.strip()[-200:]}
+    return results
+
+
+def environment(detection: bool) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "commit": commit,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cv2_threads": cv2.getNumThreads(),
+        "face_detection": detection,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float, metric: str = "p50_ms") -> list[str]:
+    """Casos cuya ``metric`` empeoró más de ``threshold`` (fracción) respecto a la línea base."""
+    regressions = []
+    for name, result in current["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if not before or not before.get(metric):
+            continue
+        change = (result[metric] - before[metric]) / before[metric]
+        if change > threshold:
+            regressions.append(f"{name}: {before[metric]:.3f} -> {result[metric]:.3f} ms (+{change:.0%})")
+    return regressions
+
+
+def startup_check(command: tuple[str, ...] = ("--cli",), runs: int = 5) -> dict:
+    """Arranca ``camera.py`` en procesos nuevos y mide el tiempo de pared y los módulos GUI importados."""
+    script = Path(__file__).resolve().parent / "camera.py"
+    samples, imported = [], set()
+    for _ in range(runs):
+        start = time.perf_counter()
+        done = subprocess.run([sys.executable, "-X", "importtime", str(script), *command],
+                              capture_output=True, text=True, cwd=script.parent)
+        samples.append((time.perf_counter() - start) * 1000.0)
+        for line in done.stderr.splitlines():
+            if line.startswith("import time:"):
+                name = line.rsplit("|", 1)[-1].strip()
+                if name.split(".")[0] in GUI_MODULES:
+                    imported.add(name.split(".")[0])
+    return {"command": " ".join(command), "median_ms": round(float(np.median(samples)), 1),
+            "max_ms": round(max(samples), 1), "gui_modules": sorted(imported)}
+
+
+def print_table(results: dict) -> None:
+    print(f"{'Caso':<42}{'fps':>10}{'p50 ms':>10}{'p99 ms':>10}{'KB/fot.':>10}")
+    for name, row in results["cases"].items():
+        print(f"{name:<42}{row['fps']:>10.1f}{row['p50_ms']:>10.3f}{row['p99_ms']:>10.3f}"
+              f"{row['alloc_bytes_per_frame'] / 1024:>10.0f}")
+
+
+def parse_size(text: str) -> tuple[int, int]:
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Banco de pruebas del procesamiento de fotogramas")
+    parser.add_argument("--repeat", type=int, default=50, help="Iteraciones medidas por caso")
+    parser.add_argument("--resolution", action="append", type=parse_size,
+                        help="Limitar a una resolución (repetible), p. ej. 1920x1080")
+    parser.add_argument("--output", type=Path, help="Guardar resultados en JSON")
+    parser.add_argument("--compare", type=Path, help="JSON de una ejecución anterior")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Regresión tolerada en p50 (0.15 = 15%%)")
+    parser.add_argument("--startup", action="store_true",
+                        help="Solo comprobar el arranque de 'camera.py --cli' frente a --startup-budget")
+    parser.add_argument("--pool", type=int, default=0, metavar="N",
+                        help="Solo medir el escalado del pool de procesos de 1 a N trabajadores")
+    parser.add_argument("--memory", action="store_true",
+                        help="Solo medir el pico de RSS por resolución, con y sin pool de búferes")
+    parser.add_argument("--memory-child", type=parse_size, help=argparse.SUPPRESS)
+    parser.add_argument("--pooled", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET_MS, help="Presupuesto de arranque (ms)")
+    args = parser.parse_args(argv)
+    if args.startup:
+        startup = startup_check()
+        print(f"Arranque '{startup['command']}': mediana {startup['median_ms']} ms, máximo {startup['max_ms']} ms "
+              f"(presupuesto {args.startup_budget:.0f} ms)")
+        if startup["gui_modules"]:
+            print(f"ERROR: el modo CLI importó {', '.join(startup['gui_modules'])}", file=sys.stderr)
+            return 1
+        return 0 if startup["median_ms"] <= args.startup_budget else 1
+    if args.memory_child:
+        print(json.dumps(memory_child(*args.memory_child, args.repeat, args.pooled)))
+        return 0
+    if args.memory:
+        report = memory_report(args.resolution or RESOLUTIONS, max(60, args.repeat))
+        for name, values in report.items():
+            if "error" in values:
+                print(f"{name}: ERROR {values['error']}")
+            else:
+                print(f"{name}: pico {values['peak_rss_mb']:.1f} MB, crecimiento en la segunda mitad "
+                      f"{values['growth_mb']} MB")
+        if args.output:
+            args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        return 0
+    if args.pool:
+        for width, height in args.resolution or [(1920, 1080)]:
+            base = None
+            for row in pool_scaling(width, height, args.pool, max(20, args.repeat)):
+                base = base or row["fps"]
+                print(f"pool/{width}x{height}/{row['workers']} procesos: {row['fps']:.1f} fps "
+                      f"(x{row['fps'] / base if base else 0:.2f})")
+        return 0
+    results = run_suite(args.resolution or RESOLUTIONS, args.repeat)
+    print_table(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"Resultados guardados en {args.output}")
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text(encoding="utf-8")), args.threshold)
+        for line in regressions:
+            print(f"REGRESIÓN {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"Sin regresiones por encima del {args.threshold:.0%} frente a {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+"""Búferes de fotograma reutilizables: ``cv2.*(dst=...)`` y ``cap.read(image)`` escriben en ellos.
+
+La propiedad es explícita: ``acquire`` entrega un búfer a un único dueño y solo vuelve a
+circular cuando ese dueño llama a ``release``. Quien necesite un fotograma más allá del
+ciclo en curso (cola del grabador, ranura MJPEG, pre-grabación, fotos) lo copia a un
+búfer propio en vez de retener el ajeno.
+"""
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+
+class BufferPool:
+    """Hasta ``per_shape`` búferes por (forma, dtype); si todos están prestados se reserva uno suelto.
+
+    ``release`` acepta cualquier array: los que no salieron de este pool (o ya se
+    devolvieron) se ignoran y devuelve False, así que el llamador no necesita saber de
+    qué pool viene cada fotograma. ``reused``/``allocated``/``overflow`` permiten
+    comprobar que en régimen estable no se reserva memoria nueva por fotograma.
+    """
+
+    def __init__(self, per_shape: int = 6) -> None:
+        self.per_shape = per_shape
+        self.reused = 0
+        self.allocated = 0
+        self.overflow = 0
+        self._free: dict[tuple, list[np.ndarray]] = {}
+        self._lent: dict[int, np.ndarray] = {}
+        self._counts: dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(shape: tuple[int, ...], dtype) -> tuple:
+        return tuple(shape), np.dtype(dtype).str
+
+    def acquire(self, shape: tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        key = self._key(shape, dtype)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                buffer = free.pop()
+                self.reused += 1
+            elif self._counts.get(key, 0) < self.per_shape:
+                buffer = np.empty(shape, dtype=dtype)
+                self._counts[key] = self._counts.get(key, 0) + 1
+                self.allocated += 1
+            else:
+                # Sin hueco: un array normal que el recolector libera; release lo ignorará.
+                self.overflow += 1
+                return np.empty(shape, dtype=dtype)
+            self._lent[id(buffer)] = buffer
+            return buffer
+
+    def like(self, frame: np.ndarray) -> np.ndarray:
+        return self.acquire(frame.shape, frame.dtype)
+
+    def release(self, buffer: np.ndarray | None) -> bool:
+        """Devuelve ``buffer`` al pool; False si no era un préstamo pendiente de este pool."""
+        if buffer is None:
+            return False
+        with self._lock:
+            if self._lent.get(id(buffer)) is not buffer:
+                return False
+            del self._lent[id(buffer)]
+            self._free.setdefault(self._key(buffer.shape, buffer.dtype), []).append(buffer)
+            return True
+
+    def owns(self, buffer: np.ndarray | None) -> bool:
+        with self._lock:
+            return buffer is not None and self._lent.get(id(buffer)) is buffer
+
+    @property
+    def lent(self) -> int:
+        with self._lock:
+            return len(self._lent)
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            free = sum(buffer.nbytes for buffers in self._free.values() for buffer in buffers)
+            return free + sum(buffer.nbytes for buffer in self._lent.values())
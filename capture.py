@@ -0,0 +1,162 @@
+"""Captura en segundo plano: un hilo productor por dispositivo con ranura "la más reciente gana"."""
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+
+from bufferpool import BufferPool
+
+
+class CaptureWorker:
+    """Lee fotogramas de una fuente tipo ``cv2.VideoCapture`` en su propio hilo.
+
+    Solo se conserva el fotograma más nuevo; si el consumidor no lo recoge antes de
+    que llegue el siguiente, el anterior se descarta y se cuenta en ``dropped``.
+    Con ``pool`` cada lectura usa ``cap.read(image)`` sobre un búfer del pool: el
+    fotograma que devuelve ``latest``/``wait_next`` pasa al consumidor, que lo devuelve con
+    ``recycle``; los que se descartan sin recoger vuelven al pool aquí. Los oyentes solo
+    pueden usar el fotograma durante la llamada y copian lo que quieran conservar.
+    """
+
+    def __init__(self, cap, name: str = "capture", stats=None, pool: BufferPool | None = None) -> None:
+        self.cap = cap
+        self.name = name
+        self.stats = stats
+        self.pool = pool
+        self.frames = 0
+        self.dropped = 0
+        self.failures = 0
+        self.fps = 0.0
+        self._frame: np.ndarray | None = None
+        self._stamp = 0.0
+        self._seq = 0
+        self._taken = 0
+        self._lock = threading.Lock()
+        self._fresh = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._listeners: list = []
+        self._release_on_exit = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "CaptureWorker":
+        if self.running and self._stop.is_set():
+            # Un lector anterior sigue dentro de cap.read(): dos hilos sobre la misma captura no.
+            raise RuntimeError(f"{self.name}: el hilo anterior aún no ha terminado")
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0) -> bool:
+        """Pide parar y espera; devuelve False si el hilo sigue vivo (bloqueado en ``cap.read()``).
+
+        En ese caso se conserva el hilo: ``start`` falla y la captura no debe reconfigurarse
+        hasta que ``stop`` devuelva True.
+        """
+        self._stop.set()
+        with self._fresh:
+            self._fresh.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return False
+            self._thread = None
+        return True
+
+    def release(self) -> None:
+        # Si el lector sigue bloqueado, cierra él la captura al salir del bucle.
+        self._release_on_exit = True
+        if self.stop() and self.cap is not None:
+            self.cap.release()
+
+    def add_listener(self, callback) -> None:
+        """Registra ``callback(seq, frame, stamp)``, llamado en el hilo productor con cada fotograma.
+
+        El oyente se retira solo en cuanto devuelve un valor falso; debe ser rápido.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def _notify(self, seq: int, frame: np.ndarray, stamp: float) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        finished = [callback for callback in listeners if not callback(seq, frame, stamp)]
+        if finished:
+            with self._lock:
+                self._listeners = [callback for callback in self._listeners if callback not in finished]
+
+    def _run(self) -> None:
+        try:
+            self._loop()
+        finally:
+            if self._release_on_exit and self.cap is not None:
+                self.cap.release()
+
+    def _loop(self) -> None:
+        last = time.monotonic()
+        shape = None
+        while not self._stop.is_set():
+            started = time.perf_counter()
+            if self.pool is not None and shape is not None:
+                buffer = self.pool.acquire(shape)
+                ok, frame = self.cap.read(buffer)
+                if not ok or frame is not buffer:
+                    self.pool.release(buffer)
+            else:
+                ok, frame = self.cap.read()
+            now = time.monotonic()
+            if self.stats is not None:
+                self.stats.record("read", (time.perf_counter() - started) * 1000.0)
+            if not ok or frame is None:
+                self.failures += 1
+                time.sleep(0.01)
+                continue
+            # Si el modo cambió, OpenCV reserva un array nuevo y el pool sigue su forma.
+            shape = frame.shape
+            with self._fresh:
+                if self._seq > self._taken:
+                    self.dropped += 1
+                    self.recycle(self._frame)
+                self._frame = frame
+                self._stamp = now
+                self._seq += 1
+                self.frames += 1
+                seq = self._seq
+                self._fresh.notify_all()
+            if self._listeners:
+                self._notify(seq, frame, now)
+            interval = now - last
+            last = now
+            if interval > 0:
+                # Media móvil exponencial: estable frente a lecturas irregulares.
+                self.fps = 1.0 / interval if self.fps == 0.0 else self.fps * 0.9 + 0.1 / interval
+
+    def latest(self) -> tuple[int, np.ndarray | None, float]:
+        """Devuelve ``(secuencia, fotograma, marca_monotónica)`` sin bloquear."""
+        with self._lock:
+            self._taken = self._seq
+            return self._seq, self._frame, self._stamp
+
+    def recycle(self, frame: np.ndarray | None) -> None:
+        """Devuelve al pool un fotograma recibido de ``latest``/``wait_next``."""
+        if self.pool is not None:
+            self.pool.release(frame)
+
+    def wait_next(self, after: int, timeout: float = 1.0) -> tuple[int, np.ndarray | None, float]:
+        """Bloquea hasta que haya un fotograma con secuencia mayor que ``after``."""
+        deadline = time.monotonic() + timeout
+        with self._fresh:
+            while self._seq <= after and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._fresh.wait(remaining)
+            self._taken = self._seq
+            return self._seq, self._frame, self._stamp
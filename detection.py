@@ -0,0 +1,196 @@
+"""Detección facial fuera del hilo de la GUI, sobre una copia reducida y con seguimiento entre pasadas."""
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from bufferpool import BufferPool
+
+Box = tuple[int, int, int, int]
+BOX_COLOR = (0, 220, 255)
+
+
+def load_face_cascade():
+    path = Path(cv2.data.haarcascades) / "haarcascade_frontalface_default.xml"
+    return cv2.CascadeClassifier(str(path)) if path.exists() else None
+
+
+def draw_boxes(frame: np.ndarray, boxes: list[Box]) -> np.ndarray:
+    for x, y, w, h in boxes:
+        cv2.rectangle(frame, (x, y), (x + w, y + h), BOX_COLOR, 2)
+    return frame
+
+
+def _center(box) -> tuple[float, float]:
+    return box[0] + box[2] / 2.0, box[1] + box[3] / 2.0
+
+
+class FaceDetector:
+    """Ejecuta ``detectMultiScale`` en un hilo trabajador.
+
+    El llamador envía como mucho un fotograma cada ``every`` fotogramas y nunca más de
+    ``max_rate`` veces por segundo; la copia se reduce a ``max_width`` antes de
+    detectar. Entre detecciones, ``boxes`` extrapola cada caja con la velocidad medida
+    respecto a la detección anterior, ya en coordenadas de resolución completa.
+    """
+
+    def __init__(self, cascade, every: int = 3, max_rate: float = 15.0, max_width: int = 480,
+                 scale_factor: float = 1.1, min_neighbors: int = 5, horizon: float = 0.5) -> None:
+        self.cascade = cascade
+        self.every = max(1, every)
+        self.max_rate = max_rate
+        self.max_width = max_width
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.horizon = horizon
+        self.detections = 0
+        self.latency_ms = 0.0
+        self.rate = 0.0
+        self._since_submit = 0
+        self._last_submit = 0.0
+        self._pending: tuple[np.ndarray, float, float] | None = None
+        self._busy = False
+        self._boxes: list[Box] = []
+        self._velocity: list[tuple[float, float]] = []
+        self._stamp = 0.0
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: threading.Thread | None = None
+        # Copias reducidas y su gris: la pendiente, la que detecta el hilo y una de reserva.
+        self._buffers = BufferPool(per_shape=3)
+
+    def start(self) -> "FaceDetector":
+        if self._thread is None:
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="face-detector", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def reset(self) -> None:
+        with self._cond:
+            if self._pending is not None:
+                self._buffers.release(self._pending[0])
+            self._boxes, self._velocity, self._pending = [], [], None
+
+    def _shrink(self, frame: np.ndarray) -> tuple[np.ndarray, float]:
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.max_width / float(width))
+        if scale < 1.0:
+            size = (int(width * scale), int(height * scale))
+            dst = self._buffers.acquire((size[1], size[0], *frame.shape[2:]), frame.dtype)
+            frame = cv2.resize(frame, size, dst=dst, interpolation=cv2.INTER_LINEAR)
+        return frame, scale
+
+    def _detect_small(self, small: np.ndarray, scale: float) -> list[Box]:
+        if small.ndim == 3:
+            gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._buffers.acquire(small.shape[:2]))
+        else:
+            gray = small
+        try:
+            found = self.cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors)
+        finally:
+            self._buffers.release(gray)
+        return [tuple(int(round(value / scale)) for value in box) for box in found]
+
+    def detect(self, frame: np.ndarray) -> list[Box]:
+        """Detección síncrona (modo sin GUI): reduce, detecta y devuelve cajas a escala completa."""
+        small, scale = self._shrink(frame)
+        try:
+            return self._detect_small(small, scale)
+        finally:
+            self._buffers.release(small)
+
+    def due(self, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if self._busy or self._pending is not None or self._since_submit < self.every:
+            return False
+        return self.max_rate <= 0 or now - self._last_submit >= 1.0 / self.max_rate
+
+    def offer(self, frame: np.ndarray, stamp: float | None = None) -> bool:
+        """Cuenta un fotograma y, si toca, envía una copia reducida al trabajador."""
+        stamp = time.monotonic() if stamp is None else stamp
+        self._since_submit += 1
+        if not self.due(stamp):
+            return False
+        # La reducción copia los píxeles, así que el llamador puede seguir dibujando sobre ``frame``.
+        small, scale = self._shrink(frame)
+        if small is frame:
+            small = self._buffers.like(frame)
+            np.copyto(small, frame)
+        with self._cond:
+            if self._pending is not None:
+                self._buffers.release(self._pending[0])
+            self._pending = (small, scale, stamp)
+            self._since_submit = 0
+            self._last_submit = stamp
+            self._cond.notify_all()
+        return True
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                small, scale, stamp = self._pending
+                self._pending = None
+                self._busy = True
+            started = time.monotonic()
+            try:
+                boxes = self._detect_small(small, scale)
+            except cv2.error:
+                boxes = []
+            finally:
+                self._buffers.release(small)
+            finished = time.monotonic()
+            with self._cond:
+                self._busy = False
+                self._track(boxes, stamp)
+                elapsed_ms = (finished - started) * 1000.0
+                self.latency_ms = elapsed_ms if self.detections == 0 else self.latency_ms * 0.8 + elapsed_ms * 0.2
+                self.detections += 1
+
+    def _track(self, boxes: list[Box], stamp: float) -> None:
+        interval = stamp - self._stamp
+        if interval > 0:
+            self.rate = 1.0 / interval if self.rate == 0.0 else self.rate * 0.8 + 0.2 / interval
+        velocity = []
+        for box in boxes:
+            cx, cy = _center(box)
+            nearest = min(self._boxes, key=lambda old: (_center(old)[0] - cx) ** 2 + (_center(old)[1] - cy) ** 2,
+                          default=None)
+            if nearest is None or interval <= 0 or interval > self.horizon * 2:
+                velocity.append((0.0, 0.0))
+                continue
+            ox, oy = _center(nearest)
+            if abs(ox - cx) > box[2] or abs(oy - cy) > box[3]:
+                velocity.append((0.0, 0.0))
+            else:
+                velocity.append(((cx - ox) / interval, (cy - oy) / interval))
+        self._boxes, self._velocity, self._stamp = boxes, velocity, stamp
+
+    def boxes(self, stamp: float | None = None) -> list[Box]:
+        """Cajas de la última detección desplazadas hasta ``stamp``."""
+        stamp = time.monotonic() if stamp is None else stamp
+        with self._cond:
+            if not self._boxes:
+                return []
+            elapsed = min(max(0.0, stamp - self._stamp), self.horizon)
+            return [(int(x + vx * elapsed), int(y + vy * elapsed), w, h)
+                    for (x, y, w, h), (vx, vy) in zip(self._boxes, self._velocity)]
+
+    def summary(self) -> str:
+        return f"rostros {self.rate:.1f} Hz, {self.latency_ms:.1f} ms"
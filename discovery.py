@@ -0,0 +1,119 @@
+"""Detección de cámaras: enumeración barata del SO, sondeo en paralelo con límite de tiempo y caché."""
+from __future__ import annotations
+
+import glob
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+import cv2
+
+from settings import get_state, update_state
+
+CACHE_KEY = "camera_cache"
+# Sin enumeración del SO (Windows/macOS) no hay forma barata de saber si cambió el
+# conjunto de dispositivos, así que la caché caduca por tiempo.
+CACHE_TTL = 24 * 3600
+PROBE_TIMEOUT = 3.0
+_VIDEO_NODE = re.compile(r"video(\d+)$")
+
+
+def enumerate_devices(limit: int = 8) -> list[int] | None:
+    """Índices de nodos de captura según el SO, o None si la plataforma no permite enumerarlos."""
+    if not sys.platform.startswith("linux"):
+        return None
+    sysfs = sorted(glob.glob("/sys/class/video4linux/video*"))
+    if sysfs:
+        found = []
+        for entry in sysfs:
+            match = _VIDEO_NODE.search(entry)
+            if not match or int(match.group(1)) >= limit:
+                continue
+            # Los nodos con index != 0 suelen ser metadatos del mismo sensor, no capturables.
+            try:
+                if Path(entry, "index").read_text().strip() not in ("", "0"):
+                    continue
+            except OSError:
+                pass
+            found.append(int(match.group(1)))
+        return sorted(found)
+    nodes = [_VIDEO_NODE.search(path) for path in glob.glob("/dev/video*")]
+    return sorted(int(match.group(1)) for match in nodes if match and int(match.group(1)) < limit)
+
+
+def device_signature(indices: list[int] | None) -> list | None:
+    if indices is None:
+        return None
+    signature = []
+    for index in indices:
+        try:
+            info = os.stat(f"/dev/video{index}")
+            signature.append([index, info.st_rdev, info.st_ctime_ns])
+        except OSError:
+            signature.append([index, 0, 0])
+    return signature
+
+
+def probe_device(index: int) -> dict | None:
+    cap = cv2.VideoCapture(index)
+    try:
+        if not cap.isOpened():
+            return None
+        return {
+            "index": index,
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": round(cap.get(cv2.CAP_PROP_FPS), 2),
+            "backend": cap.getBackendName(),
+        }
+    finally:
+        cap.release()
+
+
+def probe_devices(indices: list[int], timeout: float = PROBE_TIMEOUT) -> tuple[list[dict], bool]:
+    """Abre todos los índices a la vez; devuelve ``(cámaras, completo)``.
+
+    Los dispositivos que no responden antes de ``timeout`` se omiten y ``completo`` es False.
+    """
+    results: dict[int, dict | None] = {}
+
+    def worker(index: int) -> None:
+        try:
+            results[index] = probe_device(index)
+        except cv2.error:
+            results[index] = None
+
+    # Hilos daemon: un backend colgado no debe impedir que el proceso termine.
+    threads = [threading.Thread(target=worker, args=(index,), name=f"probe-{index}", daemon=True) for index in indices]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    complete = not any(thread.is_alive() for thread in threads)
+    return [results[index] for index in indices if results.get(index)], complete
+
+
+def discover_camera_info(limit: int = 8, refresh: bool = False, timeout: float = PROBE_TIMEOUT) -> list[dict]:
+    indices = enumerate_devices(limit)
+    signature = device_signature(indices)
+    cache = get_state(CACHE_KEY) or {}
+    if not refresh and cache.get("limit") == limit:
+        if signature is not None and cache.get("signature") == signature:
+            return cache.get("cameras", [])
+        if signature is None and time.time() - cache.get("scanned", 0) < CACHE_TTL:
+            return cache.get("cameras", [])
+    if indices == []:
+        cameras, complete = [], True
+    else:
+        cameras, complete = probe_devices(list(range(limit)) if indices is None else indices, timeout)
+    if complete:
+        update_state({CACHE_KEY: {"limit": limit, "signature": signature, "scanned": time.time(), "cameras": cameras}})
+    return cameras
+
+
+def discover_cameras(limit: int = 8, refresh: bool = False) -> list[int]:
+    return [camera["index"] for camera in discover_camera_info(limit, refresh)]
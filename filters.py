@@ -0,0 +1,230 @@
+"""Motor de filtros: compila cada filtro (o cadena "A+B") en la operación uint8 más barata.
+
+Las cadenas se funden antes de ejecutarse: LUTs consecutivas se componen en una sola
+tabla de 256 entradas, matrices de color consecutivas se multiplican en una sola
+llamada a ``cv2.transform`` y una LUT tras "Grises" se aplica sobre el plano gris.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+BASE_FILTERS = ("Normal", "Grises", "Sepia", "Invertir", "Brillo", "Contraste", "Gamma")
+FILTERS = (*BASE_FILTERS, "Grises+Invertir")
+CHAIN_SEPARATOR = "+"
+
+_RAMP = np.arange(256, dtype=np.float32)
+# Coeficientes BT.601 en orden BGR, los mismos que usa cv2.COLOR_BGR2GRAY.
+_GRAY_ROW = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+_INVERT = (255 - np.arange(256)).astype(np.uint8)
+_SEPIA = np.array([[0.272, 0.534, 0.131], [0.349, 0.686, 0.168], [0.393, 0.769, 0.189]], dtype=np.float32)
+
+
+def _lut(values: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(values), 0, 255).astype(np.uint8)
+
+
+def brightness_lut(offset: float = 40.0) -> np.ndarray:
+    return _lut(_RAMP + offset)
+
+
+def contrast_lut(gain: float = 1.3, pivot: float = 128.0) -> np.ndarray:
+    return _lut((_RAMP - pivot) * gain + pivot)
+
+
+def gamma_lut(gamma: float = 1.5) -> np.ndarray:
+    return _lut(255.0 * (_RAMP / 255.0) ** (1.0 / gamma))
+
+
+@dataclass(frozen=True)
+class Step:
+    """Paso elemental: ``kind`` es "lut", "matrix" o "gray" (con LUT opcional sobre el gris)."""
+
+    kind: str
+    table: np.ndarray | None = None
+    matrix: np.ndarray | None = None
+
+    @property
+    def saturates(self) -> bool:
+        # Una matriz con coeficientes no negativos y filas que suman <= 1 nunca sale de 0..255,
+        # así que puede fundirse con la siguiente sin perder el recorte intermedio.
+        if self.kind != "matrix":
+            return self.kind == "lut"
+        return bool((self.matrix < 0).any() or (self.matrix.sum(axis=1) > 1.0 + 1e-6).any())
+
+
+def _base_steps(name: str) -> list[Step]:
+    if name == "Grises":
+        return [Step("gray")]
+    if name == "Sepia":
+        return [Step("matrix", matrix=_SEPIA)]
+    if name == "Invertir":
+        return [Step("lut", table=_INVERT)]
+    if name == "Brillo":
+        return [Step("lut", table=brightness_lut())]
+    if name == "Contraste":
+        return [Step("lut", table=contrast_lut())]
+    if name == "Gamma":
+        return [Step("lut", table=gamma_lut())]
+    if name == "Normal":
+        return []
+    raise KeyError(f"Filtro desconocido: {name}")
+
+
+def _fuse(first: Step, second: Step) -> Step | None:
+    if first.kind == "lut" and second.kind == "lut":
+        return Step("lut", table=second.table[first.table])
+    if first.kind == "gray" and second.kind == "lut":
+        table = second.table if first.table is None else second.table[first.table]
+        return Step("gray", table=table)
+    if first.kind == "gray" and first.table is None and second.kind == "matrix":
+        gray = np.tile(_GRAY_ROW, (3, 1))
+        return Step("matrix", matrix=second.matrix @ gray)
+    if first.kind == "matrix" and not first.saturates:
+        if second.kind == "matrix":
+            return Step("matrix", matrix=second.matrix @ first.matrix)
+        if second.kind == "gray" and second.table is None:
+            return Step("matrix", matrix=np.tile(_GRAY_ROW @ first.matrix, (3, 1)))
+    return None
+
+
+def _identity(step: Step) -> bool:
+    return step.kind == "lut" and np.array_equal(step.table, np.arange(256))
+
+
+def _table_op(table: np.ndarray):
+    # bitwise_not es más barato que una LUT equivalente.
+    if np.array_equal(table, _INVERT):
+        return lambda src, dst: cv2.bitwise_not(src, dst=dst)
+    return lambda src, dst: cv2.LUT(src, table, dst=dst)
+
+
+def _lower(step: Step):
+    if step.kind == "lut":
+        return _table_op(step.table)
+    if step.kind == "matrix":
+        matrix = step.matrix
+        return lambda src, dst: cv2.transform(src, matrix, dst=dst)
+    plane = None if step.table is None else _table_op(step.table)
+
+    def gray(src, dst):
+        value = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY)
+        if plane is not None:
+            plane(value, value)
+        return cv2.cvtColor(value, cv2.COLOR_GRAY2BGR, dst=dst)
+    return gray
+
+
+class CompiledFilter:
+    """Secuencia de pasos ya fundidos, invocable como ``compiled(frame, dst=None)``."""
+
+    def __init__(self, name: str, steps: list[Step]) -> None:
+        self.name = name
+        self.steps = tuple(steps)
+        self._ops = tuple(_lower(step) for step in steps)
+
+    def __repr__(self) -> str:
+        return f"CompiledFilter({self.name!r}, steps={[step.kind for step in self.steps]})"
+
+    def __call__(self, frame: np.ndarray, dst: np.ndarray | None = None) -> np.ndarray:
+        if not self._ops:
+            if dst is None:
+                return frame
+            np.copyto(dst, frame)
+            return dst
+        out = frame
+        last = len(self._ops) - 1
+        for position, op in enumerate(self._ops):
+            out = op(out, dst if position == last else None)
+        return out
+
+
+@lru_cache(maxsize=64)
+def compile_filter(name: str) -> CompiledFilter:
+    steps: list[Step] = []
+    for part in name.split(CHAIN_SEPARATOR):
+        for step in _base_steps(part.strip()):
+            fused = _fuse(steps[-1], step) if steps else None
+            if fused is None:
+                steps.append(step)
+            else:
+                steps[-1] = fused
+            if steps and _identity(steps[-1]):
+                steps.pop()
+    return CompiledFilter(name, steps)
+
+
+def apply_filter(frame: np.ndarray, name: str, dst: np.ndarray | None = None) -> np.ndarray:
+    try:
+        compiled = compile_filter(name)
+    except KeyError:
+        return frame
+    return compiled(frame, dst)
+
+
+def _reference_filter(frame: np.ndarray, name: str) -> np.ndarray:
+    # Implementación original en float64, conservada solo para la tabla de tiempos.
+    for part in name.split(CHAIN_SEPARATOR):
+        if part == "Grises":
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            frame = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        elif part == "Sepia":
+            matrix = np.array([[0.272, 0.534, 0.131], [0.349, 0.686, 0.168], [0.393, 0.769, 0.189]])
+            frame = np.clip(frame @ matrix.T, 0, 255).astype(np.uint8)
+        elif part == "Invertir":
+            frame = cv2.bitwise_not(frame)
+        elif part in ("Brillo", "Contraste", "Gamma"):
+            table = {"Brillo": brightness_lut, "Contraste": contrast_lut, "Gamma": gamma_lut}[part]()
+            frame = table[frame]
+    return frame
+
+
+def _best_of(func, frame: np.ndarray, repeat: int) -> float:
+    func(frame)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(frame)
+        samples.append(time.perf_counter() - start)
+    return min(samples) * 1000.0
+
+
+def timing_table(size: tuple[int, int] = (1920, 1080), repeat: int = 20, names=FILTERS) -> list[dict]:
+    width, height = size
+    frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    rows = []
+    for name in names:
+        before = _best_of(lambda f: _reference_filter(f, name), frame, repeat)
+        after = _best_of(lambda f: apply_filter(f, name), frame, repeat)
+        rows.append({
+            "filter": name,
+            "steps": [step.kind for step in compile_filter(name).steps],
+            "reference_ms": round(before, 3),
+            "compiled_ms": round(after, 3),
+            "speedup": round(before / after, 1) if after > 0 else None,
+        })
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Tabla de tiempos por filtro: original vs compilado")
+    parser.add_argument("--size", default="1920x1080", help="Resolución sintética, p. ej. 1280x720")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("filters", nargs="*", help="Filtros o cadenas (por defecto FILTERS)")
+    args = parser.parse_args(argv)
+    width, height = (int(part) for part in args.size.lower().split("x"))
+    rows = timing_table((width, height), args.repeat, tuple(args.filters) or FILTERS)
+    print(f"{'Filtro':<20}{'Pasos':<16}{'Original ms':>12}{'Compilado ms':>14}{'Ganancia':>10}")
+    for row in rows:
+        print(f"{row['filter']:<20}{'+'.join(row['steps']) or '-':<16}{row['reference_ms']:>12.3f}"
+              f"{row['compiled_ms']:>14.3f}{row['speedup'] or 0:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
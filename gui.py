@@ -0,0 +1,624 @@
+"""Ventana principal de Universal Camera Pro (PyQt6 y Leviathan-UI).
+
+Solo se importa al abrir la GUI; los modos ``--cli`` y ``headless`` no cargan Qt.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtWidgets import (
+    QComboBox, QHBoxLayout, QLabel, QMainWindow, QPushButton, QSlider, QVBoxLayout, QWidget,
+)
+
+from bufferpool import BufferPool
+from capture import CaptureWorker
+from detection import FaceDetector, load_face_cascade
+from discovery import discover_camera_info
+from filters import FILTERS, apply_filter
+from instrumentation import PipelineStats, StatsExporter
+from motion import MotionDetector, MotionTrigger
+from multicam import MultiCapture
+from photos import BurstCollector, PhotoSaver
+from preroll import PreRollBuffer
+from processing import FramePipeline, zoom_frame
+from procpool import ProcessPool
+from profiles import apply_profile, load_profile, mode_label, probe_capabilities, save_profile
+from recorder import AsyncVideoWriter
+from render import PreviewRenderer, create_preview, show_frame
+from scheduler import FrameScheduler
+from settings import APP_NAME, PHOTO_DIR, RESOLUTIONS, VIDEO_DIR
+from streaming import MjpegServer
+
+try:
+    from leviathan_ui import CustomTitleBar, WipeWindow
+except ImportError:  # Keep the app usable during development without the optional theme.
+    CustomTitleBar = None
+    WipeWindow = None
+
+DISPLAY_INTERVAL_MS = 15
+PROBE_JOIN_TIMEOUT = 0.2
+RECORD_QUEUE_SIZE = 64
+BURST_SIZE = 10
+
+
+def _run_probe(cap: cv2.VideoCapture, result: dict, cancel: threading.Event) -> None:
+    result.update(probe_capabilities(cap, cancel=cancel))
+    if cancel.is_set():
+        # La ventana ya no usa esta captura: quien la sondeaba es quien la cierra.
+        cap.release()
+
+
+class CameraWindow(QMainWindow):
+    def __init__(self, camera_index: int = 0, record_policy: str = "drop_oldest",
+                 photo_format: str = "jpg", photo_quality: int = 92, detector_options: dict | None = None,
+                 preview_kind: str = "label", overlay: bool = False, stats_export: dict | None = None,
+                 preroll: dict | None = None, workers: int = 0, stream: dict | None = None,
+                 motion: dict | None = None, recording: dict | None = None, frame_budget: float = 0.0,
+                 adaptive: bool = True) -> None:
+        super().__init__()
+        self.setWindowTitle(APP_NAME)
+        self.resize(1100, 760)
+        if WipeWindow is not None:
+            try:
+                WipeWindow.create().set_mode("ghostBlur").set_background("auto").set_radius(12).apply(self)
+            except Exception:
+                pass
+
+        self.stats = PipelineStats()
+        self.overlay = overlay
+        self._overlay_report = 0.0
+        self.exporter = StatsExporter(self.stats, **stats_export).start() if stats_export else None
+        self.cap: cv2.VideoCapture | None = None
+        self.camera_index = -1
+        self.profile: dict | None = None
+        self.mode_text = ""
+        self._probe: threading.Thread | None = None
+        self._probe_result: dict = {}
+        self._probe_cancel = threading.Event()
+        self.capture: CaptureWorker | None = None
+        self.multi: MultiCapture | None = None
+        # Con ``workers`` > 0 zoom, rostros y filtro corren en procesos aparte (ver procpool).
+        self.workers = workers
+        self.pool: ProcessPool | None = None
+        self._pool_skipped = 0
+        self.stream_options = stream or {}
+        self.motion_options = dict(motion or {})
+        self.motion: MotionTrigger | None = None
+        # Solo una grabación que arrancó el movimiento se detiene sola al volver la calma.
+        self._motion_recording = False
+        self.streamer: MjpegServer | None = None
+        self._frame_seq = 0
+        self._failures_seen = 0
+        self.writer: AsyncVideoWriter | None = None
+        self.recording = False
+        self.record_policy = record_policy
+        # Segmentos, retención y time-lapse: se pasan tal cual a AsyncVideoWriter.
+        self.recording_options = recording or {}
+        self._closing_writers: list[AsyncVideoWriter] = []
+        # Últimos segundos ya procesados; al grabar se vuelcan antes que los fotogramas en vivo.
+        self.preroll = PreRollBuffer(**preroll).start() if preroll else None
+        self.photos = PhotoSaver(PHOTO_DIR, photo_format, photo_quality)
+        self._photo_jobs: list = []
+        self._bursts: list[BurstCollector] = []
+        self.face_detection = False
+        self.last_frame: np.ndarray | None = None
+        # El clasificador Haar tarda en cargarse: se crea al activar la detección por primera vez.
+        self.face_cascade = None
+        self.detector: FaceDetector | None = None
+        self._detector_options = detector_options or {}
+        self._detector_report = 0.0
+        # Zoom y filtro escriben en búferes reutilizados; ``last_frame`` se queda con el suyo hasta
+        # que lo sustituye el siguiente, y entonces vuelve a su pool (ver ``_recycle``).
+        self.buffers = BufferPool()
+        self.pipeline = FramePipeline(detector=self.detector, stats=self.stats, pool=self.buffers)
+        self.preview = create_preview(preview_kind, "Conectando con la cámara…")
+        self.renderer = PreviewRenderer()
+        # Con ``frame_budget`` = 0 el presupuesto sigue a los fps del modo negociado.
+        self.frame_budget = frame_budget
+        self.scheduler = FrameScheduler(frame_budget or 1000.0 / 30, enabled=adaptive)
+        self.preview.setMinimumSize(640, 420)
+        self.preview.setStyleSheet("background:#111722; color:#c8d1df; border-radius:8px;")
+        self.status = QLabel("Listo")
+        self.camera_combo = QComboBox()
+        self.resolution_combo = QComboBox()
+        self.filter_combo = QComboBox()
+        self.zoom = QSlider(Qt.Orientation.Horizontal)
+        self.zoom.setRange(100, 300)
+        self.zoom.setValue(100)
+        self.zoom.setToolTip("Zoom digital")
+        self.capture_button = QPushButton("Capturar")
+        self.burst_button = QPushButton(f"Ráfaga ×{BURST_SIZE}")
+        self.record_button = QPushButton("Grabar")
+        self.face_button = QPushButton("Detección: OFF")
+        self.mosaic_button = QPushButton("Mosaico")
+        self.mosaic_button.setCheckable(True)
+        self.motion_button = QPushButton("Movimiento")
+        self.motion_button.setCheckable(True)
+        self.stream_button = QPushButton("Transmitir")
+        self.stream_button.setCheckable(True)
+        self.stats_button = QPushButton("Rendimiento")
+        self.stats_button.setCheckable(True)
+        self.stats_button.setChecked(overlay)
+        self._build_ui()
+        self.probe_timer = QTimer(self)
+        self.probe_timer.timeout.connect(self._poll_probe)
+        self._populate_cameras(camera_index)
+        self._open_camera(self.camera_combo.currentData())
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._read_frame)
+        self.timer.start(DISPLAY_INTERVAL_MS)
+        self.jobs_timer = QTimer(self)
+        self.jobs_timer.timeout.connect(self._poll_jobs)
+
+    def _build_ui(self) -> None:
+        root = QWidget()
+        layout = QVBoxLayout(root)
+        layout.setContentsMargins(0, 0, 0, 0)
+        if CustomTitleBar is not None:
+            try:
+                layout.addWidget(CustomTitleBar(self, title=APP_NAME))
+            except Exception:
+                pass
+        controls = QHBoxLayout()
+        self.camera_combo.currentIndexChanged.connect(lambda: self._open_camera(self.camera_combo.currentData()))
+        self.resolution_combo.addItems([f"{w}×{h}" for w, h in RESOLUTIONS])
+        self.resolution_combo.currentIndexChanged.connect(self._apply_resolution)
+        self.filter_combo.addItems(FILTERS)
+        self.capture_button.clicked.connect(self.capture_photo)
+        self.burst_button.clicked.connect(self.capture_burst)
+        self.record_button.clicked.connect(self.toggle_recording)
+        self.face_button.clicked.connect(self.toggle_faces)
+        self.stats_button.toggled.connect(self.toggle_overlay)
+        self.mosaic_button.toggled.connect(self.toggle_mosaic)
+        self.stream_button.toggled.connect(self.toggle_stream)
+        self.motion_button.toggled.connect(self.toggle_motion)
+        controls.addWidget(QLabel("Cámara")); controls.addWidget(self.camera_combo)
+        controls.addWidget(QLabel("Resolución")); controls.addWidget(self.resolution_combo)
+        controls.addWidget(QLabel("Filtro")); controls.addWidget(self.filter_combo)
+        controls.addWidget(QLabel("Zoom")); controls.addWidget(self.zoom)
+        controls.addWidget(self.capture_button); controls.addWidget(self.burst_button); controls.addWidget(self.record_button); controls.addWidget(self.face_button)
+        controls.addWidget(self.motion_button)
+        controls.addWidget(self.mosaic_button); controls.addWidget(self.stream_button); controls.addWidget(self.stats_button)
+        layout.addWidget(self.preview, 1)
+        layout.addLayout(controls)
+        layout.addWidget(self.status)
+        self.setCentralWidget(root)
+
+    def _load_face_cascade(self):
+        return load_face_cascade()
+
+    def _ensure_detector(self) -> FaceDetector | None:
+        if self.detector is None:
+            self.face_cascade = self._load_face_cascade()
+            if self.face_cascade is not None:
+                self.detector = FaceDetector(self.face_cascade, **self._detector_options)
+                self.pipeline.detector = self.detector
+                self._apply_level()
+        return self.detector
+
+    def _populate_cameras(self, preferred: int) -> None:
+        info = discover_camera_info()
+        cameras = [camera["index"] for camera in info]
+        self.camera_combo.clear()
+        for camera in info:
+            self.camera_combo.addItem(f"Cámara {camera['index']} ({camera['width']}×{camera['height']})", camera["index"])
+        if preferred in cameras:
+            self.camera_combo.setCurrentIndex(cameras.index(preferred))
+        if not cameras:
+            self.camera_combo.addItem("Sin cámara", -1)
+            self.status.setText("No se detectó ninguna cámara conectada.")
+
+    def _close_camera(self) -> None:
+        if self._probe is not None:
+            # El sondeo usa la misma captura: se le pide parar y, si no suelta el dispositivo
+            # enseguida, lo libera él mismo al terminar en vez de bloquear la GUI.
+            self._probe_cancel.set()
+            self._probe.join(PROBE_JOIN_TIMEOUT)
+            handed_off = self._probe.is_alive()
+            self._probe = None
+            self.probe_timer.stop()
+            if handed_off:
+                self.capture = None
+                self.cap = None
+        if self.capture is not None:
+            self.capture.release()
+        elif self.cap is not None:
+            self.cap.release()
+        self.capture = None
+        self.cap = None
+        self._bursts = [burst for burst in self._bursts if burst.complete.is_set()]
+        self._frame_seq = 0
+        self._failures_seen = 0
+
+    def _open_camera(self, index) -> None:
+        self._close_camera()
+        if self.multi is not None:
+            return
+        if index is None or int(index) < 0:
+            return
+        self.cap = cv2.VideoCapture(int(index))
+        if not self.cap.isOpened():
+            self.status.setText("No se pudo abrir la cámara seleccionada.")
+            return
+        self.capture = CaptureWorker(self.cap, name=f"capture-{index}", stats=self.stats, pool=BufferPool())
+        self.camera_index = int(index)
+        self.profile = load_profile(self.camera_index)
+        if self.profile is None:
+            # Primer uso de esta cámara: se sondean sus modos fuera del hilo de la GUI y se guardan.
+            self.status.setText("Analizando los modos de la cámara…")
+            self._probe_result = {}
+            self._probe_cancel = threading.Event()
+            self._probe = threading.Thread(target=_run_probe, args=(self.cap, self._probe_result, self._probe_cancel),
+                                           name="mode-probe", daemon=True)
+            self._probe.start()
+            self.probe_timer.start(200)
+            return
+        self._apply_resolution()
+
+    def _poll_probe(self) -> None:
+        if self._probe is None or self._probe.is_alive():
+            return
+        self._probe = None
+        self.probe_timer.stop()
+        self.profile = self._probe_result
+        if self.profile.get("modes"):
+            save_profile(self.camera_index, self.profile)
+        self._apply_resolution()
+
+    def _apply_resolution(self) -> None:
+        if self.cap is None or not self.cap.isOpened() or self.capture is None or self._probe is not None:
+            return
+        # VideoCapture no es seguro entre hilos: se detiene el productor mientras se reconfigura.
+        if not self.capture.stop():
+            self.status.setText("La cámara no responde; se reintentará el cambio de modo.")
+            QTimer.singleShot(500, self._apply_resolution)
+            return
+        width, height = RESOLUTIONS[self.resolution_combo.currentIndex()]
+        mode = apply_profile(self.cap, self.profile, width, height)
+        self.capture.start()
+        self.mode_text = mode_label(mode)
+        if not self.frame_budget:
+            self.scheduler.set_fps(mode.get("measured_fps") or mode.get("fps") or 0)
+        self.scheduler.reset()
+        self._apply_level()
+        note = "" if (mode["width"], mode["height"]) == (width, height) else f" (se pidió {width}×{height})"
+        self.status.setText(f"Modo: {self.mode_text}{note}")
+
+    def _read_mosaic(self) -> None:
+        canvas, changed = self.multi.mosaic(self.preview.width(), self.preview.height())
+        if not changed:
+            return
+        # El mosaico reutiliza su lienzo: el filtro escribe en un búfer propio que pasa a ser ``last_frame``.
+        dst = self.buffers.like(canvas)
+        frame = apply_filter(canvas, self.filter_combo.currentText(), dst)
+        if frame is not dst:
+            np.copyto(dst, frame)
+            frame = dst
+        self._recycle(self.last_frame)
+        self.last_frame = frame
+        if self.streamer is not None:
+            self.streamer.offer(frame)
+        self.stats.dropped = self.multi.dropped
+        show_frame(self.preview, self.renderer, frame, None, self.stats)
+        self.stats.frame_done()
+
+    def _read_frame(self) -> None:
+        if self.multi is not None:
+            self._read_mosaic()
+            return
+        if self.capture is None:
+            return
+        seq, frame, stamp = self.capture.latest()
+        if seq == self._frame_seq or frame is None:
+            if self.capture.failures > self._failures_seen:
+                self._failures_seen = self.capture.failures
+                self.status.setText("La cámara no entregó un fotograma.")
+            return
+        self._frame_seq = seq
+        started = time.perf_counter()
+        if self.workers:
+            # ``submit`` copia a memoria compartida: el búfer de captura ya se puede devolver.
+            self._process_in_pool(frame, stamp)
+            self.capture.recycle(frame)
+        else:
+            self.pipeline.zoom = self.zoom.value()
+            self.pipeline.filter_name = self.filter_combo.currentText()
+            self.pipeline.detect = self.face_detection
+            captured, frame = frame, self.pipeline.process(frame, stamp)
+            if frame is not captured:
+                self.capture.recycle(captured)
+            if self.face_detection and self.detector is not None and stamp - self._detector_report >= 1.0:
+                self._detector_report = stamp
+                self.face_button.setText(f"Detección: ON · {self.detector.summary()}")
+            self._deliver(frame, stamp, show=True)
+        if self.scheduler.record((time.perf_counter() - started) * 1000.0):
+            self._apply_level()
+            if not self.overlay:
+                self.status.setText(f"Carga alta: {self.scheduler.label}" if self.scheduler.level else "Carga normal")
+
+    def _apply_level(self) -> None:
+        """Traslada el nivel del planificador al detector y al escalado de la vista previa."""
+        level = self.scheduler.current
+        self.renderer.smooth = level.smooth
+        if self.detector is not None:
+            self.detector.every = self._face_every()
+            self.detector.max_rate = self._detector_options.get("max_rate", 15.0) / level.detect_scale
+        if self.pool is not None:
+            self.pool.face_every = self._face_every()
+
+    def _face_every(self) -> int:
+        return max(1, self._detector_options.get("every", 3)) * self.scheduler.current.detect_scale
+
+    def _process_in_pool(self, frame: np.ndarray, stamp: float) -> None:
+        if self.pool is None or self.pool.shape != frame.shape:
+            self._close_pool()
+            self.pool = ProcessPool(frame.shape, self.workers, face_every=self._face_every(),
+                                    face_width=self._detector_options.get("max_width", 480)).start()
+        if self.pool.submit(frame, stamp, self.zoom.value(), self.filter_combo.currentText(),
+                            self.face_detection) is None:
+            # Anillo lleno: la vista previa salta este fotograma, igual que la captura "el más reciente gana".
+            self._pool_skipped += 1
+        results = self.pool.ready()
+        self.stats.record("pool", self.pool.latency_ms)
+        for position, (_, done_stamp, done) in enumerate(results):
+            self._deliver(done, done_stamp, show=position == len(results) - 1)
+
+    def _close_pool(self) -> None:
+        if self.pool is None:
+            return
+        # Los fotogramas aún en vuelo se graban antes de cerrar el pool.
+        for _, stamp, frame in self.pool.drain(1.0):
+            self._deliver(frame, stamp, show=False)
+        # ``last_frame`` puede ser una vista de la memoria compartida, que no sobrevive al pool.
+        if self.pool.owns(self.last_frame):
+            held, self.last_frame = self.last_frame, self.last_frame.copy()
+            self.pool.release(held)
+        self.pool.close()
+        self.pool = None
+
+    def _deliver(self, frame: np.ndarray, stamp: float, show: bool) -> None:
+        # Nadie modifica ``frame`` después de este punto y quien lo guarde (grabador, MJPEG,
+        # pre-grabación) hace su copia: basta con cambiar la referencia y devolver la anterior.
+        if frame is not self.last_frame:
+            self._recycle(self.last_frame)
+        self.last_frame = frame
+        if self.motion is not None:
+            with self.stats.stage("motion"):
+                self.motion.update(frame, stamp)
+        if self.recording and self.writer is not None:
+            with self.stats.stage("record"):
+                self.writer.write(frame, stamp)
+        elif self.preroll is not None:
+            self.preroll.offer(frame, stamp)
+        if self.streamer is not None:
+            self.streamer.offer(frame)
+        # La vista previa es lo único que el planificador puede saltarse: lo anterior ya se grabó.
+        if not show or not self.scheduler.show_preview():
+            return
+        self.stats.dropped = (self.capture.dropped if self.capture is not None else 0) + self._pool_skipped
+        overlay = None
+        if self.overlay:
+            overlay = self.stats.summary_line().replace(" · ", "\n", 2) + f"\n{self.scheduler.label}"
+            if stamp - self._overlay_report >= 0.5:
+                self._overlay_report = stamp
+                self.status.setText(f"{self.stats.summary_line()} · {self.scheduler.label}")
+        show_frame(self.preview, self.renderer, frame, overlay, self.stats)
+        self.stats.frame_done(stamp)
+
+    def _recycle(self, frame: np.ndarray | None) -> None:
+        """Devuelve un fotograma ya sustituido al pool del que salió (pipeline, procesos o captura)."""
+        if self.buffers.release(frame) or (self.pool is not None and self.pool.release(frame)):
+            return
+        if self.capture is not None:
+            self.capture.recycle(frame)
+
+    def _ensure_dirs(self) -> None:
+        PHOTO_DIR.mkdir(parents=True, exist_ok=True)
+        VIDEO_DIR.mkdir(parents=True, exist_ok=True)
+
+    def capture_photo(self) -> None:
+        if self.last_frame is None:
+            self.status.setText("No hay fotograma disponible para capturar.")
+            return
+        # La foto se guarda en otro hilo: se copia porque ``last_frame`` vuelve al pool al sustituirse.
+        self._photo_jobs.append(self.photos.submit(self.last_frame.copy(), datetime.now()))
+        self.jobs_timer.start(100)
+
+    def capture_burst(self) -> None:
+        if self.capture is None or not self.capture.running:
+            self.status.setText("No hay señal de cámara para la ráfaga.")
+            return
+        zoom, name = self.zoom.value(), self.filter_combo.currentText()
+        burst = BurstCollector(BURST_SIZE, self.photos, lambda frame: apply_filter(zoom_frame(frame, zoom), name))
+        self._bursts.append(burst)
+        self.capture.add_listener(burst)
+        self.status.setText(f"Ráfaga de {BURST_SIZE} fotos en curso…")
+        self.jobs_timer.start(100)
+
+    def toggle_mosaic(self, enabled: bool) -> None:
+        if enabled:
+            if self.recording:
+                self.toggle_recording()
+            indices = [self.camera_combo.itemData(i) for i in range(self.camera_combo.count())]
+            indices = [int(index) for index in indices if index is not None and int(index) >= 0]
+            self._close_camera()
+            width, height = RESOLUTIONS[self.resolution_combo.currentIndex()]
+            self.multi = MultiCapture(indices, (width, height)).start()
+            if not self.multi.tiles:
+                self.multi = None
+                self.status.setText("No hay cámaras disponibles para el mosaico.")
+                self.mosaic_button.setChecked(False)
+                return
+            self.status.setText(f"Mosaico de {len(self.multi.tiles)} cámaras")
+            return
+        if self.multi is not None:
+            self._stop_multi_recording()
+            self.multi.release()
+            self.multi = None
+            self.record_button.setText("Grabar")
+            self._open_camera(self.camera_combo.currentData())
+
+    def _stop_multi_recording(self) -> None:
+        for index in self.multi.recording():
+            self._closing_writers.append(self.multi.stop_recording(index))
+        self.jobs_timer.start(100)
+
+    def _toggle_multi_recording(self) -> None:
+        if self.multi.recording():
+            self._stop_multi_recording()
+            self.record_button.setText("Grabar")
+            self.status.setText("Guardando grabaciones…")
+            return
+        started = [self.multi.start_recording(index, VIDEO_DIR, self.record_policy, **self.recording_options)
+                   for index in self.multi.indices]
+        started = [writer for writer in started if writer is not None]
+        if not started:
+            self.status.setText("No se pudo iniciar ninguna grabación.")
+            return
+        self.record_button.setText("Detener")
+        self.status.setText(f"Grabando {len(started)} cámaras en {VIDEO_DIR}")
+
+    def toggle_recording(self) -> None:
+        if self.multi is not None:
+            self._toggle_multi_recording()
+            return
+        if self.recording:
+            self.recording = False
+            self._motion_recording = False
+            if self.writer is not None:
+                # El hilo escritor vacía la cola por su cuenta; la GUI solo consulta si terminó.
+                self.writer.close()
+                self._closing_writers.append(self.writer)
+                self.writer = None
+                self.jobs_timer.start(100)
+            self.record_button.setText("Grabar")
+            self.status.setText("Guardando grabación…")
+            return
+        if self.last_frame is None:
+            self.status.setText("No hay señal de cámara para grabar.")
+            return
+        self._ensure_dirs()
+        height, width = self.last_frame.shape[:2]
+        path = VIDEO_DIR / f"video-{datetime.now():%Y%m%d-%H%M%S}.avi"
+        fps = round(self.capture.fps) if self.capture is not None else 0
+        self.writer = AsyncVideoWriter(path, (width, height), fps, max_queue=RECORD_QUEUE_SIZE, policy=self.record_policy,
+                                       **self.recording_options)
+        preroll = self.preroll.snapshot() if self.preroll is not None else None
+        if not self.writer.open(preroll):
+            self.writer = None
+            self.status.setText("No se pudo iniciar el archivo AVI.")
+            return
+        if self.preroll is not None:
+            self.preroll.clear()
+        self.recording = True
+        self.record_button.setText("Detener")
+        extra = f" (+{preroll[-1][0] - preroll[0][0]:.1f} s previos)" if preroll else ""
+        self.status.setText(f"Grabando: {self.writer.path}{extra}")
+
+    def _poll_jobs(self) -> None:
+        for burst in [b for b in self._bursts if b.complete.is_set()]:
+            self._bursts.remove(burst)
+            self._photo_jobs.extend(burst.futures)
+        for job in [j for j in self._photo_jobs if j.done()]:
+            self._photo_jobs.remove(job)
+            error = job.exception()
+            self.status.setText(f"No se pudo guardar la foto: {error}" if error else f"Foto guardada: {job.result()}")
+        for writer in [w for w in self._closing_writers if w.done.is_set()]:
+            self._closing_writers.remove(writer)
+            lost = f", {writer.dropped} descartados" if writer.dropped else ""
+            parts = f", {len(writer.segments)} segmentos" if len(writer.segments) > 1 else ""
+            detail = f"Error: {writer.error}" if writer.error else f"{writer.written} fotogramas{lost}{parts}"
+            self.status.setText(f"Grabación guardada: {writer.path} ({detail})")
+        if not (self._closing_writers or self._photo_jobs or self._bursts):
+            self.jobs_timer.stop()
+
+    def toggle_faces(self) -> None:
+        self.face_detection = not self.face_detection
+        self.face_button.setText(f"Detección: {'ON' if self.face_detection else 'OFF'}")
+        if self.face_detection:
+            self._ensure_detector()
+        if self.detector is None:
+            if self.face_detection:
+                self.status.setText("No se encontró el clasificador Haar de OpenCV.")
+            return
+        if self.face_detection:
+            self.detector.start()
+        else:
+            self.detector.stop()
+            self.detector.reset()
+
+    def toggle_overlay(self, enabled: bool) -> None:
+        self.overlay = enabled
+        if not enabled:
+            self.status.setText(f"Modo: {self.mode_text}" if self.mode_text else "Listo")
+
+    def _motion_start(self):
+        if not self.recording:
+            self.toggle_recording()
+            self._motion_recording = self.recording
+        return self.writer.path if self.recording and self.writer is not None else None
+
+    def _motion_stop(self) -> None:
+        # Una grabación iniciada a mano sigue hasta que el operador la detenga.
+        if self.recording and self._motion_recording:
+            self.toggle_recording()
+
+    def toggle_motion(self, enabled: bool) -> None:
+        if not enabled:
+            if self.motion is not None:
+                self.motion.finish()
+                self.motion = None
+            self.status.setText("Grabación por movimiento desactivada")
+            return
+        cooldown = self.motion_options.get("cooldown", 5.0)
+        detector = MotionDetector(self.motion_options.get("sensitivity", 0.5), roi=self.motion_options.get("roi"))
+        self.motion = MotionTrigger(detector, self._motion_start, self._motion_stop, cooldown,
+                                    VIDEO_DIR / "motion-events.jsonl")
+        self.status.setText(f"Esperando movimiento (se detiene tras {cooldown:.0f} s sin cambios)")
+
+    def toggle_stream(self, enabled: bool) -> None:
+        if not enabled:
+            if self.streamer is not None:
+                self.streamer.stop()
+                self.streamer = None
+            self.status.setText("Transmisión detenida")
+            return
+        try:
+            self.streamer = MjpegServer(title=APP_NAME, **self.stream_options).start()
+        except OSError as exc:
+            self.stream_button.setChecked(False)
+            self.status.setText(f"No se pudo iniciar la transmisión: {exc}")
+            return
+        self.status.setText(f"Transmitiendo en {self.streamer.url}")
+
+    def closeEvent(self, event) -> None:
+        self.timer.stop()
+        self._close_pool()
+        if self.motion is not None:
+            self.motion.finish()
+        if self.writer is not None:
+            self._closing_writers.append(self.writer)
+            self.writer = None
+        if self.multi is not None:
+            self._stop_multi_recording()
+        self.hide()
+        for writer in self._closing_writers:
+            writer.close(wait=True, timeout=10.0)
+        self.photos.shutdown(wait=True)
+        if self.preroll is not None:
+            self.preroll.stop()
+        if self.detector is not None:
+            self.detector.stop()
+        if self.multi is not None:
+            self.multi.release()
+        self._close_camera()
+        if self.streamer is not None:
+            self.streamer.stop()
+        if self.exporter is not None:
+            self.exporter.stop()
+        event.accept()
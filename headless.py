@@ -0,0 +1,273 @@
+"""Modo sin pantalla: captura desde un dispositivo o archivo, fotos periódicas y grabación, sin PyQt6."""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+
+from bufferpool import BufferPool
+from detection import FaceDetector, load_face_cascade
+from filters import FILTERS
+from instrumentation import EXPORT_FORMATS, PipelineStats, StatsExporter
+from motion import MotionDetector, MotionTrigger, parse_roi
+from photos import PHOTO_FORMATS, PhotoSaver
+from processing import FramePipeline
+from procpool import ProcessPool
+from recorder import QUEUE_POLICIES, AsyncVideoWriter
+from settings import APP_NAME, PHOTO_DIR, VIDEO_DIR
+from sources import DEFAULT_FPS, open_source
+from streaming import MjpegServer
+
+
+def add_recording_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--segment-seconds", type=float, default=0.0,
+                        help="Partir la grabación en archivos de N segundos (0 = un solo archivo)")
+    parser.add_argument("--segment-mb", type=int, default=0, help="Partir la grabación al llegar a N MB por archivo")
+    parser.add_argument("--retain-mb", type=int, default=0,
+                        help="Borrar las grabaciones más antiguas de la carpeta por encima de N MB en total")
+    parser.add_argument("--timelapse", type=float, default=0.0, metavar="SEGUNDOS",
+                        help="Time-lapse: conservar un fotograma cada N segundos")
+
+
+def recording_options(args: argparse.Namespace) -> dict:
+    return {"segment_seconds": args.segment_seconds, "segment_bytes": args.segment_mb * 1024 * 1024,
+            "retain_bytes": args.retain_mb * 1024 * 1024, "timelapse": args.timelapse}
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--source", default="0", help="Índice de cámara, archivo de vídeo, carpeta de imágenes o URL")
+    parser.add_argument("--realtime", action="store_true",
+                        help="Reproducir archivos y carpetas a su fps en lugar de tan rápido como sea posible")
+    parser.add_argument("--loop", action="store_true", help="Volver a empezar al agotar un archivo o carpeta")
+    parser.add_argument("--source-fps", type=float, default=DEFAULT_FPS, help="fps nominales de una carpeta de imágenes")
+    parser.add_argument("--duration", type=float, default=0.0, help="Segundos a procesar (0 = hasta agotar la fuente)")
+    parser.add_argument("--frames", type=int, default=0, help="Máximo de fotogramas (0 = sin límite)")
+    parser.add_argument("--record", action="store_true", help="Grabar la salida procesada en VIDEO_DIR")
+    parser.add_argument("--photo-every", type=float, default=0.0, help="Guardar una foto cada N segundos")
+    parser.add_argument("--photo-format", choices=PHOTO_FORMATS, default="jpg")
+    parser.add_argument("--photo-quality", type=int, default=92)
+    parser.add_argument("--output", type=Path, default=None, help="Carpeta de salida para fotos y vídeo")
+    parser.add_argument("--filter", default="Normal", help=f"Filtro o cadena A+B ({', '.join(FILTERS)})")
+    parser.add_argument("--zoom", type=int, default=100, help="Zoom digital en porcentaje (100-300)")
+    parser.add_argument("--faces", action="store_true", help="Marcar rostros con el clasificador Haar")
+    parser.add_argument("--face-every", type=int, default=3)
+    parser.add_argument("--face-width", type=int, default=480)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Procesos para zoom, rostros y filtro sobre memoria compartida (0 = en línea)")
+    parser.add_argument("--motion", action="store_true",
+                        help="Grabar solo mientras haya movimiento (un archivo por evento)")
+    parser.add_argument("--motion-sensitivity", type=float, default=0.5, help="Sensibilidad al movimiento (0-1)")
+    parser.add_argument("--motion-cooldown", type=float, default=5.0,
+                        help="Segundos sin movimiento antes de cerrar el archivo")
+    parser.add_argument("--motion-roi", type=parse_roi, help="Zona vigilada x,y,ancho,alto en fracciones (0-1)")
+    parser.add_argument("--record-policy", choices=QUEUE_POLICIES, default="block")
+    add_recording_arguments(parser)
+    parser.add_argument("--stream", type=int, default=0, metavar="PUERTO",
+                        help="Servir la salida procesada como MJPEG en este puerto (0 = no)")
+    parser.add_argument("--stream-host", default="0.0.0.0")
+    parser.add_argument("--stats-file", type=Path, help="Exportar métricas periódicamente a este archivo")
+    parser.add_argument("--stats-format", choices=EXPORT_FORMATS, default="json")
+    parser.add_argument("--stats-interval", type=float, default=5.0)
+
+
+def build_pipeline(args: argparse.Namespace, stats: PipelineStats | None = None) -> FramePipeline:
+    detector = None
+    if args.faces:
+        cascade = load_face_cascade()
+        if cascade is None:
+            print("Aviso: no se encontró el clasificador Haar; se omite la detección.", file=sys.stderr)
+        else:
+            detector = FaceDetector(cascade, every=args.face_every, max_width=args.face_width)
+    return FramePipeline(args.zoom, args.filter, detector, detect=detector is not None, sync_detection=True,
+                         stats=stats, pool=BufferPool())
+
+
+def run(args: argparse.Namespace) -> int:
+    cap = open_source(args.source, args.realtime, args.loop, args.source_fps)
+    is_device = cap.live
+    if not cap.isOpened():
+        print(f"No se pudo abrir la fuente: {args.source}", file=sys.stderr)
+        return 1
+    stats = PipelineStats(window=1000)
+    exporter = StatsExporter(stats, args.stats_file, args.stats_format, args.stats_interval).start() if args.stats_file else None
+    pipeline = build_pipeline(args, stats)
+    streamer = None
+    if args.stream:
+        try:
+            streamer = MjpegServer(args.stream_host, args.stream, title=APP_NAME).start()
+        except OSError as exc:
+            print(f"No se pudo iniciar el servidor MJPEG: {exc}", file=sys.stderr)
+            cap.release()
+            return 1
+        print(f"Transmitiendo en {streamer.url}stream.mjpg")
+    source_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    photos = PhotoSaver(args.output or PHOTO_DIR, args.photo_format, args.photo_quality) if args.photo_every > 0 else None
+    photo_jobs = []
+    writer: AsyncVideoWriter | None = None
+    finished: list[AsyncVideoWriter] = []
+    pool: ProcessPool | None = None
+    source_times: dict[int, float] = {}
+    frames = failures = 0
+    started = time.monotonic()
+    last_photo = 0.0
+    source_time = 0.0
+    current: dict = {}
+    buffers = BufferPool()
+    shape = None
+    # Si solo se graba en time-lapse, los fotogramas que el escritor no quiere ni se filtran.
+    gated = args.timelapse > 0 and args.record and not (args.motion or photos or streamer)
+
+    def open_writer(prefix: str = "video", suffix: str = ""):
+        nonlocal writer
+        directory = args.output or VIDEO_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{prefix}-{datetime.now():%Y%m%d-%H%M%S}{suffix}.avi"
+        height, width = current["shape"][:2]
+        candidate = AsyncVideoWriter(path, (width, height), round(source_fps) or 24, policy=args.record_policy,
+                                     pace=is_device, **recording_options(args))
+        if not candidate.open():
+            print(f"No se pudo crear {path}", file=sys.stderr)
+            return None
+        writer = candidate
+        return path
+
+    def close_writer() -> None:
+        nonlocal writer
+        if writer is not None:
+            writer.close()
+            finished.append(writer)
+            writer = None
+
+    motion = None
+    if args.motion:
+        detector = MotionDetector(args.motion_sensitivity, roi=args.motion_roi)
+        motion = MotionTrigger(detector, lambda: open_writer("motion", f"-{len(finished) + 1:03d}"), close_writer,
+                               args.motion_cooldown, (args.output or VIDEO_DIR) / "motion-events.jsonl")
+
+    def deliver(frame, now: float, frame_time: float) -> bool:
+        nonlocal last_photo
+        current["shape"] = frame.shape
+        if motion is not None:
+            with stats.stage("motion"):
+                motion.update(frame, frame_time)
+        elif args.record and writer is None and open_writer() is None:
+            return False
+        if writer is not None:
+            with stats.stage("record"):
+                writer.write(frame, now if is_device else frame_time)
+        if photos is not None and (not photo_jobs or frame_time - last_photo >= args.photo_every):
+            last_photo = frame_time
+            # Los búferes vuelven al pool tras cada fotograma: la foto se guarda desde una copia.
+            photo_jobs.append(photos.submit(frame.copy()))
+        if streamer is not None:
+            streamer.offer(frame)
+        stats.frame_done(now)
+        return True
+
+    def deliver_pooled(results) -> bool:
+        for seq, now, done in results:
+            stats.record("pool", pool.latency_ms)
+            delivered = deliver(done, now, source_times.pop(seq))
+            # ``done`` es una vista de la memoria compartida: su ranura vuelve al anillo.
+            pool.release(done)
+            if not delivered:
+                return False
+        return True
+
+    try:
+        while True:
+            with stats.stage("read"):
+                buffer = buffers.acquire(shape) if shape else None
+                ok, frame = cap.read(buffer) if buffer is not None else cap.read()
+            now = time.monotonic()
+            if not ok or frame is not buffer:
+                buffers.release(buffer)
+            if not ok:
+                if is_device and failures < 30:
+                    failures += 1
+                    continue
+                break
+            shape = frame.shape
+            # En archivos el reloj es el de la fuente, así una misma entrada da la misma salida.
+            source_time = cap.position
+            if args.duration and source_time >= args.duration:
+                break
+            frames += 1
+            if gated and writer is not None and not writer.wants(now if is_device else source_time):
+                writer.skipped += 1
+                stats.frame_done(now)
+            elif args.workers > 0:
+                if pool is None:
+                    pool = ProcessPool(frame.shape, args.workers, face_every=args.face_every,
+                                       face_width=args.face_width).start()
+                while (seq := pool.submit(frame, now, args.zoom, args.filter, args.faces)) is None:
+                    if not deliver_pooled(pool.ready(0.05)):
+                        return 1
+                source_times[seq] = source_time
+                if not deliver_pooled(pool.ready()):
+                    return 1
+            else:
+                out = pipeline.process(frame, now)
+                delivered = deliver(out, now, source_time)
+                pipeline.release(out)
+                if not delivered:
+                    return 1
+            # Todo consumidor que conserva el fotograma ya hizo su copia.
+            buffers.release(frame)
+            if args.frames and frames >= args.frames:
+                break
+        if pool is not None and not deliver_pooled(pool.drain(30.0)):
+            return 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        if pool is not None:
+            pool.close()
+        elapsed = time.monotonic() - started
+        if motion is not None:
+            motion.finish(source_time)
+        close_writer()
+        for done in finished:
+            done.close(wait=True)
+        if photos is not None:
+            photos.shutdown(wait=True)
+        if exporter is not None:
+            exporter.stop()
+        if streamer is not None:
+            streamer.stop()
+    total = time.monotonic() - started
+    saved = sum(1 for job in photo_jobs if job.exception() is None)
+    print(f"Fotogramas: {frames} en {elapsed:.2f} s ({frames / elapsed if elapsed else 0:.1f} fps de proceso)")
+    print(f"Tiempo de fuente: {source_time:.2f} s, fallos de lectura: {failures}")
+    snapshot = stats.snapshot()
+    for name, values in snapshot["stages"].items():
+        print(f"  {name:<8} p50 {values['p50_ms']:.3f} ms  p99 {values['p99_ms']:.3f} ms")
+    for name, values in snapshot["waits"].items():
+        print(f"  {name:<8} p50 {values['p50_ms']:.3f} ms  p99 {values['p99_ms']:.3f} ms  (espera a la fuente)")
+    if photos is not None:
+        print(f"Fotos guardadas: {saved}/{len(photo_jobs)}")
+    for done in finished:
+        segments = f" en {len(done.segments)} segmentos hasta" if len(done.segments) > 1 else ""
+        print(f"Vídeo{segments}: {done.path} ({done.written} fotogramas escritos, {done.duplicated} duplicados, "
+              f"{done.decimated} omitidos, {done.dropped} descartados por cola)")
+        if done.skipped or done.deleted:
+            print(f"  time-lapse: {done.skipped} fotogramas saltados; retención: {done.deleted} segmentos borrados")
+    if motion is not None:
+        print(f"Eventos de movimiento: {motion.events}")
+    print(f"Tiempo total con vaciado de colas: {total:.2f} s")
+    return 0 if frames else 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Universal Camera Pro sin interfaz gráfica")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+"""Instrumentación del pipeline: tiempos por etapa, fps móviles, descartes y exportación periódica."""
+from __future__ import annotations
+
+import collections
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from settings import set_default_mode
+
+STAGES = ("read", "zoom", "detect", "filter", "record", "convert", "display")
+# Tiempo bloqueado esperando a la fuente, no coste de proceso: se informa aparte de las etapas.
+WAIT_STAGES = ("read",)
+EXPORT_FORMATS = ("json", "prom")
+
+
+class PipelineStats:
+    """Ventanas móviles de duración por etapa (ms) y de marcas de fin de fotograma.
+
+    Es seguro llamarla desde varios hilos: la captura registra ``read`` en su propio hilo.
+    Además de la ventana se acumulan suma y número de muestras desde el arranque, que es
+    lo que un ``summary`` de Prometheus espera en ``_sum`` y ``_count``.
+    """
+
+    def __init__(self, window: int = 120) -> None:
+        self.window = window
+        self.frames = 0
+        self.dropped = 0
+        self._stages: dict[str, collections.deque] = {}
+        self._totals: dict[str, list[float]] = {}
+        self._stamps: collections.deque = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        with self._lock:
+            samples = self._stages.get(stage)
+            if samples is None:
+                samples = self._stages[stage] = collections.deque(maxlen=self.window)
+                self._totals[stage] = [0, 0.0]
+            samples.append(elapsed_ms)
+            totals = self._totals[stage]
+            totals[0] += 1
+            totals[1] += elapsed_ms
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000.0)
+
+    def frame_done(self, stamp: float | None = None) -> None:
+        with self._lock:
+            self.frames += 1
+            self._stamps.append(time.monotonic() if stamp is None else stamp)
+
+    @property
+    def fps(self) -> float:
+        with self._lock:
+            if len(self._stamps) < 2:
+                return 0.0
+            span = self._stamps[-1] - self._stamps[0]
+            return (len(self._stamps) - 1) / span if span > 0 else 0.0
+
+    def snapshot(self) -> dict:
+        """``stages`` es el coste de proceso por etapa; ``waits``, el tiempo bloqueado en la fuente."""
+        fps = self.fps
+        with self._lock:
+            stages, waits = {}, {}
+            for name in sorted(self._stages, key=lambda n: STAGES.index(n) if n in STAGES else len(STAGES)):
+                ordered = sorted(self._stages[name])
+                count, total = self._totals[name]
+                (waits if name in WAIT_STAGES else stages)[name] = {
+                    "p50_ms": round(ordered[len(ordered) // 2], 3),
+                    "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 3),
+                    "last_ms": round(self._stages[name][-1], 3),
+                    "count": int(count),
+                    "sum_ms": round(total, 3),
+                }
+            return {"time": time.time(), "fps": round(fps, 2), "frames": self.frames, "dropped": self.dropped,
+                    "stages": stages, "waits": waits}
+
+    def summary_line(self) -> str:
+        data = self.snapshot()
+        parts = [f"{data['fps']:.1f} fps", f"descartados {data['dropped']}"]
+        parts += [f"{name} {values['p50_ms']:.1f}/{values['p99_ms']:.1f}" for name, values in data["stages"].items()]
+        parts += [f"espera {name} {values['p50_ms']:.1f}/{values['p99_ms']:.1f}"
+                  for name, values in data["waits"].items()]
+        return " · ".join(parts)
+
+    def to_prometheus(self, prefix: str = "camera") -> str:
+        data = self.snapshot()
+        lines = [
+            f"# TYPE {prefix}_fps gauge", f"{prefix}_fps {data['fps']}",
+            f"# TYPE {prefix}_frames_total counter", f"{prefix}_frames_total {data['frames']}",
+            f"# TYPE {prefix}_dropped_frames_total counter", f"{prefix}_dropped_frames_total {data['dropped']}",
+        ]
+        # Cuantiles sobre la ventana móvil; _sum y _count acumulados desde el arranque.
+        for metric, group in (("stage_ms", data["stages"]), ("wait_ms", data["waits"])):
+            if not group:
+                continue
+            lines.append(f"# TYPE {prefix}_{metric} summary")
+            for name, values in group.items():
+                lines.append(f'{prefix}_{metric}{{stage="{name}",quantile="0.5"}} {values["p50_ms"]}')
+                lines.append(f'{prefix}_{metric}{{stage="{name}",quantile="0.99"}} {values["p99_ms"]}')
+                lines.append(f'{prefix}_{metric}_sum{{stage="{name}"}} {values["sum_ms"]}')
+                lines.append(f'{prefix}_{metric}_count{{stage="{name}"}} {values["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+class StatsExporter:
+    """Escribe periódicamente una instantánea en JSON o en formato de texto de Prometheus."""
+
+    def __init__(self, stats: PipelineStats, path: Path | str, fmt: str = "json", interval: float = 5.0) -> None:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Formato de exportación desconocido: {fmt}")
+        self.stats = stats
+        self.path = Path(path)
+        self.fmt = fmt
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "StatsExporter":
+        self._thread = threading.Thread(target=self._run, name="stats-exporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval + 1.0)
+            self._thread = None
+        self.export()
+
+    def export(self) -> None:
+        text = self.stats.to_prometheus() if self.fmt == "prom" else json.dumps(self.stats.snapshot(), indent=2) + "\n"
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}-", suffix=".tmp")
+            set_default_mode(fd)
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(text)
+            os.replace(temp, self.path)
+        except OSError:
+            pass
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.export()
@@ -0,0 +1,142 @@
+"""Captura simultánea de varias cámaras, con mosaico para la vista previa y grabación por cámara."""
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from capture import CaptureWorker
+from recorder import AsyncVideoWriter
+
+TILE_BACKGROUND = (34, 23, 17)
+
+
+def grid_shape(count: int) -> tuple[int, int]:
+    cols = max(1, math.ceil(math.sqrt(count)))
+    return cols, max(1, math.ceil(count / cols))
+
+
+class _Tile:
+    def __init__(self, index: int, worker: CaptureWorker) -> None:
+        self.index = index
+        self.worker = worker
+        self.seq = 0
+        self.image: np.ndarray | None = None
+        self.writer: AsyncVideoWriter | None = None
+
+
+class MultiCapture:
+    """Un ``CaptureWorker`` por cámara; cada mosaico solo redimensiona las celdas con fotograma nuevo.
+
+    El coste crece con el número de cámaras (una lectura y un redimensionado por celda),
+    y las grabaciones se alimentan desde el hilo de cada cámara, sin pasar por la GUI.
+    """
+
+    def __init__(self, indices: list[int], resolution: tuple[int, int] | None = None) -> None:
+        self.tiles: list[_Tile] = []
+        for index in indices:
+            cap = cv2.VideoCapture(int(index))
+            if not cap.isOpened():
+                cap.release()
+                continue
+            if resolution is not None:
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+            self.tiles.append(_Tile(index, CaptureWorker(cap, name=f"capture-{index}")))
+        self._canvas: np.ndarray | None = None
+        self._layout: tuple | None = None
+
+    @property
+    def indices(self) -> list[int]:
+        return [tile.index for tile in self.tiles]
+
+    def start(self) -> "MultiCapture":
+        for tile in self.tiles:
+            tile.worker.start()
+        return self
+
+    def release(self) -> None:
+        for tile in self.tiles:
+            self.stop_recording(tile.index)
+            tile.worker.release()
+
+    @property
+    def dropped(self) -> int:
+        return sum(tile.worker.dropped for tile in self.tiles)
+
+    def mosaic(self, bound_w: int, bound_h: int, labels: bool = True) -> tuple[np.ndarray | None, bool]:
+        """Devuelve ``(lienzo, cambió)``; el lienzo se reutiliza mientras no cambie el tamaño."""
+        if not self.tiles:
+            return None, False
+        cols, rows = grid_shape(len(self.tiles))
+        cell_w, cell_h = max(1, bound_w // cols), max(1, bound_h // rows)
+        layout = (cols, rows, cell_w, cell_h)
+        if layout != self._layout:
+            self._canvas = np.empty((cell_h * rows, cell_w * cols, 3), dtype=np.uint8)
+            self._canvas[:] = TILE_BACKGROUND
+            self._layout = layout
+            for tile in self.tiles:
+                tile.seq = 0
+        changed = False
+        for position, tile in enumerate(self.tiles):
+            seq, frame, _ = tile.worker.latest()
+            if frame is None or seq == tile.seq:
+                continue
+            tile.seq = seq
+            changed = True
+            height, width = frame.shape[:2]
+            scale = min(cell_w / width, cell_h / height)
+            size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            if tile.image is None or tile.image.shape[:2] != (size[1], size[0]):
+                tile.image = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            cv2.resize(frame, size, dst=tile.image, interpolation=cv2.INTER_AREA if scale <= 0.5 else cv2.INTER_LINEAR)
+            if labels:
+                recording = " REC" if tile.writer is not None else ""
+                cv2.putText(tile.image, f"Camara {tile.index}{recording}", (8, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                            (0, 220, 255), 1, cv2.LINE_AA)
+            col, row = position % cols, position // cols
+            x0 = col * cell_w + (cell_w - size[0]) // 2
+            y0 = row * cell_h + (cell_h - size[1]) // 2
+            self._canvas[y0:y0 + size[1], x0:x0 + size[0]] = tile.image
+        return self._canvas, changed
+
+    def _tile(self, index: int) -> _Tile | None:
+        return next((tile for tile in self.tiles if tile.index == index), None)
+
+    def start_recording(self, index: int, directory: Path, policy: str = "drop_oldest",
+                        **options) -> AsyncVideoWriter | None:
+        tile = self._tile(index)
+        if tile is None or tile.writer is not None:
+            return None
+        _, frame, _ = tile.worker.latest()
+        if frame is None:
+            return None
+        directory.mkdir(parents=True, exist_ok=True)
+        height, width = frame.shape[:2]
+        path = directory / f"video-cam{index}-{datetime.now():%Y%m%d-%H%M%S}.avi"
+        writer = AsyncVideoWriter(path, (width, height), round(tile.worker.fps), policy=policy, **options)
+        if not writer.open():
+            return None
+        tile.writer = writer
+
+        def feed(seq: int, image: np.ndarray, stamp: float) -> bool:
+            if tile.writer is not writer:
+                return False
+            writer.write(image, stamp)
+            return True
+        tile.worker.add_listener(feed)
+        return writer
+
+    def stop_recording(self, index: int) -> AsyncVideoWriter | None:
+        tile = self._tile(index)
+        if tile is None or tile.writer is None:
+            return None
+        writer, tile.writer = tile.writer, None
+        writer.close()
+        return writer
+
+    def recording(self) -> list[int]:
+        return [tile.index for tile in self.tiles if tile.writer is not None]
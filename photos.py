@@ -0,0 +1,123 @@
+"""Guardado de fotos fuera del hilo de la GUI: codificación en un pool, escritura atómica y ráfagas."""
+from __future__ import annotations
+
+import itertools
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import cv2
+import numpy as np
+
+from settings import PHOTO_FORMATS, set_default_mode
+
+
+def encode_params(fmt: str, quality: int) -> list[int]:
+    quality = max(0, min(100, int(quality)))
+    if fmt == "jpg":
+        return [cv2.IMWRITE_JPEG_QUALITY, quality]
+    if fmt == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, max(1, quality)]
+    if fmt == "png":
+        # PNG no tiene calidad: a más calidad pedida, menos tiempo de compresión.
+        return [cv2.IMWRITE_PNG_COMPRESSION, round((100 - quality) * 9 / 100)]
+    raise ValueError(f"Formato de foto no soportado: {fmt}")
+
+
+def reserve_path(directory: Path, stem: str, suffix: str) -> Path:
+    """Crea un archivo vacío con nombre único; O_EXCL garantiza que nadie más lo obtiene."""
+    for attempt in itertools.count():
+        name = f"{stem}{'' if attempt == 0 else f'-{attempt}'}.{suffix}"
+        path = directory / name
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            return path
+        except FileExistsError:
+            continue
+    raise AssertionError("unreachable")
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}-", suffix=".tmp")
+    try:
+        set_default_mode(fd)
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            os.unlink(temp)
+        except OSError:
+            pass
+        raise
+
+
+class PhotoSaver:
+    """Pool de hilos que codifica y guarda fotogramas; cv2 libera el GIL al codificar."""
+
+    def __init__(self, directory: Path, fmt: str = "jpg", quality: int = 92, workers: int = 2) -> None:
+        if fmt not in PHOTO_FORMATS:
+            raise ValueError(f"Formato de foto no soportado: {fmt}")
+        self.directory = Path(directory)
+        self.fmt = fmt
+        self.quality = quality
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="photo")
+
+    def _save(self, frame: np.ndarray, stem: str, transform: Callable[[np.ndarray], np.ndarray] | None) -> Path:
+        if transform is not None:
+            frame = transform(frame)
+        ok, encoded = cv2.imencode(f".{self.fmt}", frame, encode_params(self.fmt, self.quality))
+        if not ok:
+            raise RuntimeError(f"No se pudo codificar la foto como {self.fmt}")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = reserve_path(self.directory, stem, self.fmt)
+        try:
+            write_atomic(path, encoded.tobytes())
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+        return path
+
+    def submit(self, frame: np.ndarray, taken: datetime | None = None, prefix: str = "photo",
+               transform: Callable[[np.ndarray], np.ndarray] | None = None) -> Future:
+        taken = taken or datetime.now()
+        stem = f"{prefix}-{taken:%Y%m%d-%H%M%S-%f}"
+        return self._pool.submit(self._save, frame, stem, transform)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+class BurstCollector:
+    """Recoge ``count`` fotogramas consecutivos desde el hilo de captura y los entrega al pool.
+
+    Se registra como oyente de ``CaptureWorker``: copia cada fotograma (el búfer de
+    captura vuelve al pool) a la cadencia real de la cámara y solo al completar la
+    ráfaga envía el lote a guardar.
+    """
+
+    def __init__(self, count: int, saver: PhotoSaver,
+                 transform: Callable[[np.ndarray], np.ndarray] | None = None) -> None:
+        self.count = max(1, count)
+        self.saver = saver
+        self.transform = transform
+        self.frames: list[tuple[datetime, np.ndarray]] = []
+        self.futures: list[Future] = []
+        self.complete = threading.Event()
+
+    def __call__(self, seq: int, frame: np.ndarray, stamp: float) -> bool:
+        """Devuelve False cuando ya no necesita más fotogramas."""
+        if self.complete.is_set():
+            return False
+        self.frames.append((datetime.now(), frame.copy()))
+        if len(self.frames) < self.count:
+            return True
+        for taken, image in self.frames:
+            self.futures.append(self.saver.submit(image, taken, "burst", self.transform))
+        self.frames = []
+        self.complete.set()
+        return False
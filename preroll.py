@@ -0,0 +1,106 @@
+"""Búfer de pre-grabación: los últimos segundos de vídeo en JPEG, con un tope de memoria estricto."""
+from __future__ import annotations
+
+import collections
+import threading
+
+import cv2
+import numpy as np
+
+from bufferpool import BufferPool
+
+
+class PreRollBuffer:
+    """Mantiene ``(marca, jpeg)`` de los últimos ``seconds`` segundos sin superar ``max_bytes``.
+
+    ``offer`` solo deja el fotograma en una ranura "el más reciente gana"; la codificación
+    ocurre en un hilo propio, así que la vista previa no paga el JPEG. Si el codificador no
+    da abasto se guardan menos fotogramas por segundo, nunca más memoria. La ranura es
+    una copia en un búfer propio, así que el llamador puede reutilizar el suyo al volver.
+    """
+
+    def __init__(self, seconds: float = 5.0, max_bytes: int = 64 * 1024 * 1024, quality: int = 80,
+                 scale: float = 1.0) -> None:
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.scale = scale
+        self.encoded = 0
+        self.skipped = 0
+        self._frames: collections.deque = collections.deque()
+        self._bytes = 0
+        self._slot: tuple[float, np.ndarray] | None = None
+        self._buffers = BufferPool(per_shape=3)
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def start(self) -> "PreRollBuffer":
+        if self._thread is None:
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="preroll", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def clear(self) -> None:
+        with self._cond:
+            self._frames.clear()
+            self._bytes = 0
+
+    def offer(self, frame: np.ndarray, stamp: float) -> None:
+        with self._cond:
+            if self._slot is not None:
+                self.skipped += 1
+                self._buffers.release(self._slot[1])
+            copy = self._buffers.like(frame)
+            np.copyto(copy, frame)
+            self._slot = (stamp, copy)
+            self._cond.notify_all()
+
+    def snapshot(self) -> list[tuple[float, bytes]]:
+        with self._cond:
+            return list(self._frames)
+
+    def _trim(self, newest: float) -> None:
+        while self._frames and (self._bytes > self.max_bytes or newest - self._frames[0][0] > self.seconds):
+            _, data = self._frames.popleft()
+            self._bytes -= len(data)
+
+    def _run(self) -> None:
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        while True:
+            with self._cond:
+                while self._slot is None and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                stamp, frame = self._slot
+                self._slot = None
+            try:
+                if self.scale < 1.0:
+                    ok, data = cv2.imencode(".jpg", cv2.resize(frame, None, fx=self.scale, fy=self.scale,
+                                                               interpolation=cv2.INTER_AREA), params)
+                else:
+                    ok, data = cv2.imencode(".jpg", frame, params)
+            finally:
+                self._buffers.release(frame)
+            if not ok:
+                continue
+            payload = data.tobytes()
+            with self._cond:
+                self._frames.append((stamp, payload))
+                self._bytes += len(payload)
+                self.encoded += 1
+                self._trim(stamp)
@@ -0,0 +1,83 @@
+"""Etapas por fotograma compartidas por la GUI y el modo sin pantalla: zoom, rostros y filtro."""
+from __future__ import annotations
+
+import time
+from contextlib import nullcontext
+
+import cv2
+import numpy as np
+
+from bufferpool import BufferPool
+from detection import FaceDetector, draw_boxes
+from filters import apply_filter
+
+
+def zoom_frame(frame: np.ndarray, percent: int, dst: np.ndarray | None = None) -> np.ndarray:
+    if percent <= 100:
+        return frame
+    height, width = frame.shape[:2]
+    factor = max(1.0, percent / 100.0)
+    crop_w, crop_h = int(width / factor), int(height / factor)
+    x0, y0 = (width - crop_w) // 2, (height - crop_h) // 2
+    cropped = frame[y0:y0 + crop_h, x0:x0 + crop_w]
+    return cv2.resize(cropped, (width, height), dst=dst, interpolation=cv2.INTER_LINEAR)
+
+
+class FramePipeline:
+    """Aplica zoom, detección facial y filtro en el mismo orden que la vista previa.
+
+    Con ``sync_detection`` (modo sin GUI) el detector corre en línea cada ``every``
+    fotogramas y reutiliza las cajas entre medias; si no, usa el hilo del detector.
+    Con ``pool`` el zoom y el filtro escriben en búferes reutilizados en vez de reservar;
+    el fotograma devuelto pertenece entonces al llamador, que lo entrega con ``release``.
+    """
+
+    def __init__(self, zoom: int = 100, filter_name: str = "Normal", detector: FaceDetector | None = None,
+                 detect: bool = False, sync_detection: bool = False, stats=None,
+                 pool: BufferPool | None = None) -> None:
+        self.zoom = zoom
+        self.filter_name = filter_name
+        self.detector = detector
+        self.detect = detect
+        self.sync_detection = sync_detection
+        self.stats = stats
+        self.pool = pool
+        self._since_detect = 0
+        self._boxes: list = []
+
+    def faces(self, frame: np.ndarray, stamp: float) -> list:
+        if not self.sync_detection:
+            self.detector.offer(frame, stamp)
+            return self.detector.boxes(stamp)
+        if self._since_detect % self.detector.every == 0:
+            self._boxes = self.detector.detect(frame)
+        self._since_detect += 1
+        return self._boxes
+
+    def _stage(self, name: str):
+        return self.stats.stage(name) if self.stats is not None else nullcontext()
+
+    def process(self, frame: np.ndarray, stamp: float | None = None) -> np.ndarray:
+        stamp = time.monotonic() if stamp is None else stamp
+        with self._stage("zoom"):
+            pooled = self.pool is not None and self.zoom > 100
+            frame = zoom_frame(frame, self.zoom, self.pool.like(frame) if pooled else None)
+        if self.detect and self.detector is not None:
+            with self._stage("detect"):
+                draw_boxes(frame, self.faces(frame, stamp))
+        with self._stage("filter"):
+            if self.pool is None or self.filter_name == "Normal":
+                return apply_filter(frame, self.filter_name)
+            # No se filtra sobre el propio búfer: cv2.transform con dst=src reserva una copia temporal.
+            dst = self.pool.like(frame)
+            out = apply_filter(frame, self.filter_name, dst)
+            if out is not dst:
+                self.pool.release(dst)
+            else:
+                # El búfer intermedio del zoom ya no lo usa nadie.
+                self.pool.release(frame)
+            return out
+
+    def release(self, frame: np.ndarray | None) -> bool:
+        """Devuelve al pool un fotograma salido de ``process``; ignora los que no son suyos."""
+        return self.pool is not None and self.pool.release(frame)
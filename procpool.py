@@ -0,0 +1,210 @@
+"""Procesamiento en varios procesos: zoom, rostros y filtro sobre un anillo de memoria compartida.
+
+Los fotogramas nunca se serializan: el proceso principal copia cada uno en una ranura de
+``multiprocessing.shared_memory`` y por la cola solo viajan índices y parámetros. Cada
+trabajador escribe el resultado en la ranura gemela de salida y los resultados se
+devuelven en el orden de envío, aunque terminen desordenados.
+"""
+from __future__ import annotations
+
+import collections
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from detection import draw_boxes, load_face_cascade
+from filters import apply_filter
+from processing import zoom_frame
+
+
+def _worker(in_name: str, out_name: str, shape: tuple, slots: int, tasks, results, face_width: int) -> None:
+    # Un hilo de OpenCV por proceso: el paralelismo ya lo dan los procesos.
+    cv2.setNumThreads(1)
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    inputs = np.ndarray((slots, *shape), dtype=np.uint8, buffer=shm_in.buf)
+    outputs = np.ndarray((slots, *shape), dtype=np.uint8, buffer=shm_out.buf)
+    cascade = None
+    src = dst = None
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            seq, slot, zoom, filter_name, detect, boxes = task
+            # Cada indexación crea una vista nueva: se fijan una vez para poder compararlas con ``is``.
+            src, dst = inputs[slot], outputs[slot]
+            try:
+                frame = zoom_frame(src, zoom)
+                if detect:
+                    if cascade is None:
+                        cascade = load_face_cascade()
+                    boxes = _detect(cascade, frame, face_width) if cascade is not None else []
+                if boxes:
+                    if frame is src:
+                        frame = frame.copy()
+                    draw_boxes(frame, boxes)
+                out = apply_filter(frame, filter_name, dst)
+                if out is not dst:
+                    np.copyto(dst, out)
+                results.put((seq, slot, boxes if detect else None, None))
+            except Exception as exc:  # El proceso debe sobrevivir a un fotograma defectuoso.
+                results.put((seq, slot, None, str(exc)))
+    finally:
+        del inputs, outputs, src, dst
+        shm_in.close()
+        shm_out.close()
+
+
+def _detect(cascade, frame: np.ndarray, max_width: int) -> list:
+    height, width = frame.shape[:2]
+    scale = min(1.0, max_width / width)
+    small = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA) if scale < 1.0 else frame
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    found = cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
+    return [tuple(int(v / scale) for v in box) for box in found]
+
+
+class ProcessPool:
+    """``workers`` procesos y ``slots`` ranuras de entrada/salida para fotogramas de forma ``shape``.
+
+    ``submit`` copia el fotograma en una ranura libre (o devuelve ``None`` si el anillo
+    está lleno); ``ready`` entrega los resultados contiguos ya terminados, en orden, como
+    vistas de la memoria compartida. Cada ranura sigue ocupada hasta que su vista vuelve
+    con ``release``, y ninguna vista debe sobrevivir a ``close``. La forma es fija: si
+    cambia la resolución se crea otro pool.
+    """
+
+    def __init__(self, shape: tuple[int, int, int], workers: int = 2, slots: int | None = None,
+                 face_every: int = 3, face_width: int = 480) -> None:
+        self.shape = tuple(shape)
+        self.workers = max(1, workers)
+        self.slots = slots or self.workers * 2
+        self.face_every = max(1, face_every)
+        self.face_width = face_width
+        self.submitted = 0
+        self.completed = 0
+        self.errors = 0
+        self.last_error: str | None = None
+        self.latency_ms = 0.0
+        nbytes = int(np.prod(self.shape)) * self.slots
+        self._shm_in = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._shm_out = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._inputs = np.ndarray((self.slots, *self.shape), dtype=np.uint8, buffer=self._shm_in.buf)
+        self._outputs = np.ndarray((self.slots, *self.shape), dtype=np.uint8, buffer=self._shm_out.buf)
+        # "spawn" evita heredar hilos y estado de Qt en los hijos.
+        self._ctx = mp.get_context("spawn")
+        self._tasks = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._free = collections.deque(range(self.slots))
+        self._stamps: dict[int, tuple[float, float]] = {}
+        self._done: dict[int, tuple[int, str | None]] = {}
+        self._lent: dict[int, tuple[np.ndarray, int]] = {}
+        self._next = 0
+        self._boxes: list = []
+        self._processes: list = []
+
+    def start(self) -> "ProcessPool":
+        for number in range(self.workers):
+            process = self._ctx.Process(
+                target=_worker, name=f"frame-worker-{number}", daemon=True,
+                args=(self._shm_in.name, self._shm_out.name, self.shape, self.slots, self._tasks, self._results,
+                      self.face_width))
+            process.start()
+            self._processes.append(process)
+        return self
+
+    @property
+    def in_flight(self) -> int:
+        return self.slots - len(self._free)
+
+    def submit(self, frame: np.ndarray, stamp: float | None = None, zoom: int = 100, filter_name: str = "Normal",
+               detect: bool = False) -> int | None:
+        """Encola ``frame`` y devuelve su número; ``None`` si el anillo está lleno (llame a ``ready``)."""
+        if frame.shape != self.shape:
+            raise ValueError(f"Forma {frame.shape} distinta de la del pool {self.shape}")
+        if not self._free:
+            return None
+        slot = self._free.popleft()
+        np.copyto(self._inputs[slot], frame)
+        seq = self.submitted
+        self.submitted += 1
+        run_detect = detect and seq % self.face_every == 0
+        self._stamps[seq] = (time.monotonic() if stamp is None else stamp, time.perf_counter())
+        self._tasks.put((seq, slot, zoom, filter_name, run_detect, self._boxes if detect else []))
+        return seq
+
+    def _collect(self, timeout: float | None) -> None:
+        try:
+            item = self._results.get(timeout=timeout) if timeout is None or timeout > 0 else self._results.get_nowait()
+        except queue.Empty:
+            return
+        while True:
+            seq, slot, boxes, error = item
+            self._done[seq] = (slot, error)
+            if boxes is not None:
+                self._boxes = boxes
+            try:
+                item = self._results.get_nowait()
+            except queue.Empty:
+                return
+
+    def ready(self, timeout: float = 0.0) -> list[tuple[int, float, np.ndarray]]:
+        """``(seq, marca, fotograma)`` terminados y contiguos; cada fotograma es una vista que se devuelve con ``release``."""
+        self._collect(timeout)
+        out = []
+        while self._next in self._done:
+            slot, error = self._done.pop(self._next)
+            stamp, started = self._stamps.pop(self._next)
+            self.latency_ms = (time.perf_counter() - started) * 1000.0
+            if error is None:
+                view = self._outputs[slot]
+                self._lent[id(view)] = (view, slot)
+                out.append((self._next, stamp, view))
+                self.completed += 1
+            else:
+                self.errors += 1
+                self.last_error = error
+                self._free.append(slot)
+            self._next += 1
+        return out
+
+    def owns(self, frame: np.ndarray | None) -> bool:
+        entry = self._lent.get(id(frame))
+        return entry is not None and entry[0] is frame
+
+    def release(self, frame: np.ndarray | None) -> bool:
+        """Libera la ranura de una vista de ``ready``; False si ``frame`` no es una vista pendiente."""
+        if not self.owns(frame):
+            return False
+        _, slot = self._lent.pop(id(frame))
+        self._free.append(slot)
+        return True
+
+    def drain(self, timeout: float = 5.0) -> list[tuple[int, float, np.ndarray]]:
+        deadline = time.monotonic() + timeout
+        out = []
+        while self._next < self.submitted and time.monotonic() < deadline:
+            out.extend(self.ready(max(0.0, min(0.1, deadline - time.monotonic()))))
+        return out
+
+    def close(self) -> None:
+        if self._shm_in is None:
+            return
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(2.0)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._lent.clear()
+        del self._inputs, self._outputs
+        for shm in (self._shm_in, self._shm_out):
+            shm.close()
+            shm.unlink()
+        self._shm_in = self._shm_out = None
@@ -0,0 +1,138 @@
+"""Perfiles por cámara: modos (resolución × FOURCC) aceptados, fps medidos y negociación.
+
+Muchas webcams UVC solo llegan a 5-10 fps a 1080p en YUYV sin comprimir y a 30 fps en
+MJPG. El sondeo prueba cada combinación, lee el modo que el driver aceptó de verdad y
+mide los fps; el resultado se guarda en el estado por usuario (``settings.STATE_PATH``)
+para no repetirlo.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import cv2
+
+from settings import RESOLUTIONS, get_state, update_state
+
+PROFILE_KEY = "camera_profiles"
+FOURCCS = ("MJPG", "YUYV")
+MEASURE_SECONDS = 0.6
+WARMUP_FRAMES = 3
+
+
+def fourcc_text(value: float) -> str:
+    code = int(value)
+    text = "".join(chr((code >> 8 * shift) & 0xFF) for shift in range(4))
+    return text if text.isprintable() and text.strip() else ""
+
+
+def device_key(index: int) -> str:
+    """Índice más nombre del driver si el SO lo expone: otro modelo en el mismo índice no reutiliza el perfil."""
+    try:
+        name = Path(f"/sys/class/video4linux/video{index}/name").read_text(encoding="utf-8").strip()
+    except OSError:
+        name = ""
+    return f"{index}:{name}" if name else str(index)
+
+
+def current_mode(cap: cv2.VideoCapture) -> dict:
+    return {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fourcc": fourcc_text(cap.get(cv2.CAP_PROP_FOURCC)),
+        "fps": round(cap.get(cv2.CAP_PROP_FPS), 2),
+    }
+
+
+def negotiate(cap: cv2.VideoCapture, width: int, height: int, fourcc: str | None = None) -> dict:
+    """Pide el modo y devuelve el que el driver dejó realmente (puede diferir del pedido)."""
+    if fourcc:
+        # El FOURCC va antes que el tamaño: V4L2 elige la lista de tamaños según el formato.
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    return current_mode(cap)
+
+
+def measure_fps(cap: cv2.VideoCapture, seconds: float = MEASURE_SECONDS,
+                cancel: threading.Event | None = None) -> float:
+    for _ in range(WARMUP_FRAMES):
+        if not cap.grab():
+            return 0.0
+    frames = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds and not (cancel is not None and cancel.is_set()):
+        if not cap.grab():
+            break
+        frames += 1
+    elapsed = time.perf_counter() - start
+    return round(frames / elapsed, 1) if elapsed > 0 and frames else 0.0
+
+
+def probe_capabilities(cap: cv2.VideoCapture, resolutions=RESOLUTIONS, fourccs=FOURCCS,
+                       seconds: float = MEASURE_SECONDS, cancel: threading.Event | None = None) -> dict:
+    """Prueba cada resolución × FOURCC sobre una captura ya abierta y elige el más rápido por tamaño.
+
+    Si ``cancel`` se activa, termina tras el modo en curso y devuelve ``{}`` (nada que guardar).
+    """
+    modes = []
+    seen = set()
+    for width, height in resolutions:
+        for fourcc in fourccs:
+            if cancel is not None and cancel.is_set():
+                return {}
+            mode = negotiate(cap, width, height, fourcc)
+            key = (mode["width"], mode["height"], mode["fourcc"])
+            if (mode["width"], mode["height"]) != (width, height) or key in seen:
+                continue
+            seen.add(key)
+            mode["measured_fps"] = measure_fps(cap, seconds, cancel)
+            if mode["measured_fps"] > 0:
+                modes.append(mode)
+    best = {}
+    for mode in modes:
+        size = f"{mode['width']}x{mode['height']}"
+        current = best.get(size)
+        if current is None or mode["measured_fps"] > current["measured_fps"]:
+            best[size] = mode
+    return {"backend": cap.getBackendName(), "probed": time.time(), "modes": modes,
+            "best": {size: mode["fourcc"] for size, mode in best.items()}}
+
+
+def load_profile(index: int) -> dict | None:
+    return (get_state(PROFILE_KEY) or {}).get(device_key(index))
+
+
+def save_profile(index: int, profile: dict) -> bool:
+    profiles = dict(get_state(PROFILE_KEY) or {})
+    profiles[device_key(index)] = profile
+    return update_state({PROFILE_KEY: profiles})
+
+
+def apply_profile(cap: cv2.VideoCapture, profile: dict | None, width: int, height: int) -> dict:
+    """Negocia el tamaño pedido con el FOURCC más rápido del perfil (o el del driver si no hay perfil).
+
+    Si el perfil sabe que el tamaño no está soportado, usa el mayor modo medido que quepa.
+    """
+    if not profile or not profile.get("modes"):
+        return negotiate(cap, width, height)
+    size = f"{width}x{height}"
+    if size not in profile.get("best", {}):
+        fitting = [mode for mode in profile["modes"] if mode["width"] <= width and mode["height"] <= height]
+        if fitting:
+            chosen = max(fitting, key=lambda mode: (mode["width"] * mode["height"], mode["measured_fps"]))
+            width, height = chosen["width"], chosen["height"]
+            size = f"{width}x{height}"
+    mode = negotiate(cap, width, height, profile.get("best", {}).get(size))
+    measured = [m for m in profile["modes"] if (m["width"], m["height"], m["fourcc"]) ==
+                (mode["width"], mode["height"], mode["fourcc"])]
+    if measured:
+        mode["measured_fps"] = measured[0]["measured_fps"]
+    return mode
+
+
+def mode_label(mode: dict) -> str:
+    fps = mode.get("measured_fps") or mode.get("fps") or 0
+    fourcc = f" {mode['fourcc']}" if mode.get("fourcc") else ""
+    return f"{mode['width']}×{mode['height']}{fourcc} @ {fps:g} fps"
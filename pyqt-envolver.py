@@ -1,31 +1,295 @@
-"""Diagnóstico opcional del entorno Qt para Universal Camera Pro.
+"""Diagnóstico opcional del entorno Qt y del rendimiento de captura para Universal Camera Pro.
 
 No modifica .bashrc ni instala paquetes automáticamente. El usuario decide
 si desea aplicar las recomendaciones mostradas.
+
+Además del entorno gráfico, informa de los backends de vídeo de OpenCV, de sus
+optimizaciones SIMD y de sus hilos; mide cada backend con las cámaras detectadas (o
+con un vídeo sintético si no hay ninguna) y recomienda backend y número de hilos.
 """
 from __future__ import annotations
 
+import argparse
 import importlib.util
+import json
 import os
 import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Valores de ``cv::CpuFeatures``: no todas las compilaciones exportan las constantes ``cv2.CPU_*``.
+SIMD_FEATURES = {"SSE2": 3, "SSE3": 4, "SSSE3": 5, "SSE4_1": 6, "SSE4_2": 7, "POPCNT": 8, "FP16": 9, "AVX": 10,
+                 "AVX2": 11, "FMA3": 12, "AVX_512F": 13, "AVX512_SKX": 256, "NEON": 100, "VSX": 200}
+OPEN_TIMEOUT = 5.0
+SYNTHETIC_SIZE = (1280, 720)
+SYNTHETIC_FRAMES = 120
 
 
 def is_wayland() -> bool:
     return os.environ.get("XDG_SESSION_TYPE", "").lower() == "wayland"
 
 
-def main() -> int:
-    session = "Wayland" if is_wayland() else os.environ.get("XDG_SESSION_TYPE", "X11/unknown")
-    print(f"Sesión gráfica detectada: {session}")
-    print(f"QT_QPA_PLATFORM={os.environ.get('QT_QPA_PLATFORM', '<no definida>')}")
-    for module in ("cv2", "numpy", "PyQt6", "leviathan_ui"):
-        state = "disponible" if importlib.util.find_spec(module) else "ausente"
-        print(f"{module}: {state}")
-    if shutil.which("python") is None and shutil.which("python3") is None:
+def environment_report() -> dict:
+    return {
+        "session": "Wayland" if is_wayland() else os.environ.get("XDG_SESSION_TYPE", "X11/unknown"),
+        "qt_qpa_platform": os.environ.get("QT_QPA_PLATFORM"),
+        "modules": {module: importlib.util.find_spec(module) is not None
+                    for module in ("cv2", "numpy", "PyQt6", "leviathan_ui")},
+        "python_in_path": shutil.which("python") is not None or shutil.which("python3") is not None,
+    }
+
+
+def _build_section(info: str, title: str) -> dict[str, str]:
+    """Pares ``clave: valor`` de una sección de ``cv2.getBuildInformation()``."""
+    values: dict[str, str] = {}
+    inside = False
+    for line in info.splitlines():
+        if not line.startswith("    ") and line.strip():
+            inside = line.strip().rstrip(":") == title
+            continue
+        if inside and ":" in line:
+            key, value = line.split(":", 1)
+            values[key.strip()] = value.strip()
+    return values
+
+
+def opencv_report() -> dict:
+    import cv2
+    from cv2 import videoio_registry as registry
+
+    info = cv2.getBuildInformation()
+    features = {name: bool(cv2.checkHardwareSupport(getattr(cv2, f"CPU_{name}", value)))
+                for name, value in SIMD_FEATURES.items()}
+    cpu = _build_section(info, "CPU/HW features")
+    parallel = next((line.split(":", 1)[1].strip() for line in info.splitlines()
+                     if line.strip().startswith("Parallel framework:")), "")
+    return {
+        "version": cv2.__version__,
+        "video_io": _build_section(info, "Video I/O"),
+        "camera_backends": [registry.getBackendName(api) for api in registry.getCameraBackends()
+                            if registry.hasBackend(api)],
+        "stream_backends": [registry.getBackendName(api) for api in registry.getStreamBackends()
+                            if registry.hasBackend(api)],
+        "optimized": cv2.useOptimized(),
+        "baseline": cpu.get("Baseline", ""),
+        "dispatched": cpu.get("Dispatched code generation", ""),
+        "cpu_features": [name for name, present in features.items() if present],
+        # ``*`` marca el código despachado en tiempo de ejecución y ``?`` lo que esta CPU no soporta.
+        "features_line": cv2.getCPUFeaturesLine() if hasattr(cv2, "getCPUFeaturesLine") else "",
+        "threads": cv2.getNumThreads(),
+        "cpus": cv2.getNumberOfCPUs(),
+        "parallel_framework": parallel,
+    }
+
+
+def _with_timeout(func, timeout: float):
+    # Hilo daemon: un backend colgado (típico de GStreamer sin dispositivo) no bloquea el diagnóstico.
+    result: dict = {}
+    thread = threading.Thread(target=lambda: result.update(value=func()), name="doctor-open", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return result.get("value")
+
+
+def time_backend(target, api: int, seconds: float) -> dict:
+    """Latencia de apertura, del primer fotograma y fps sostenidos de ``target`` con un backend concreto."""
+    import cv2
+    from cv2 import videoio_registry as registry
+
+    name = registry.getBackendName(api)
+    started = time.perf_counter()
+    cap = _with_timeout(lambda: cv2.VideoCapture(target, api), OPEN_TIMEOUT)
+    opened = time.perf_counter()
+    if cap is None:
+        return {"backend": name, "ok": False, "error": f"sin respuesta en {OPEN_TIMEOUT:g} s"}
+    try:
+        if not cap.isOpened():
+            return {"backend": name, "ok": False, "error": "no abre"}
+        ok, frame = cap.read()
+        first = time.perf_counter()
+        if not ok or frame is None:
+            return {"backend": name, "ok": False, "error": "no entrega fotogramas"}
+        frames = 0
+        measure = time.perf_counter()
+        while time.perf_counter() - measure < seconds:
+            ok, _ = cap.read()
+            if not ok:
+                if isinstance(target, str):
+                    # Un archivo se agota antes de tiempo: se vuelve al principio.
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    continue
+                break
+            frames += 1
+        elapsed = time.perf_counter() - measure
+        return {
+            "backend": name, "ok": True,
+            "open_ms": round((opened - started) * 1000.0, 1),
+            "first_frame_ms": round((first - opened) * 1000.0, 1),
+            "fps": round(frames / elapsed, 1) if elapsed > 0 else 0.0,
+            "size": f"{frame.shape[1]}x{frame.shape[0]}",
+        }
+    finally:
+        cap.release()
+
+
+def synthetic_video(directory: Path) -> Path | None:
+    """AVI MJPG corto con contenido en movimiento, para medir decodificación sin cámara."""
+    import cv2
+    import numpy as np
+
+    path = directory / "doctor-synthetic.avi"
+    width, height = SYNTHETIC_SIZE
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (width, height))
+    if not writer.isOpened():
+        return None
+    x = np.linspace(0, 255, width, dtype=np.uint8)
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    for index in range(SYNTHETIC_FRAMES):
+        frame[:] = np.roll(x, index * 8)[None, :, None]
+        cv2.circle(frame, ((index * 10) % width, height // 2), 60, (0, 200, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def capture_report(seconds: float, limit: int = 8) -> dict:
+    from cv2 import videoio_registry as registry
+
+    from discovery import enumerate_devices
+
+    indices = enumerate_devices(limit)
+    if indices is None:
+        # Sin enumeración del SO (Windows/macOS) se prueba al menos la cámara por defecto.
+        indices = [0]
+    camera_apis = [api for api in registry.getCameraBackends() if registry.hasBackend(api)]
+    targets = []
+    for index in indices:
+        runs = [time_backend(index, api, seconds) for api in camera_apis]
+        if any(run["ok"] for run in runs):
+            targets.append({"source": f"camera {index}", "runs": runs})
+    if not targets:
+        with tempfile.TemporaryDirectory(prefix="camera-doctor-") as directory:
+            path = synthetic_video(Path(directory))
+            if path is not None:
+                # V4L2 solo abre dispositivos y CV_IMAGES secuencias de imágenes, no un AVI.
+                stream_apis = [api for api in registry.getStreamBackends() if registry.hasBackend(api)
+                               and registry.getBackendName(api) not in ("CV_IMAGES", "V4L2")]
+                targets.append({"source": "synthetic", "runs": [time_backend(str(path), api, seconds)
+                                                                for api in stream_apis]})
+    return {"targets": targets}
+
+
+def thread_report(repeat: int = 20) -> dict:
+    """Tiempo del trabajo típico de un fotograma 1080p (zoom + filtro) con distintos hilos de OpenCV."""
+    import cv2
+    import numpy as np
+
+    from filters import apply_filter
+
+    frame = np.random.default_rng(0).integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+    zoomed = np.empty_like(frame)
+    filtered = np.empty_like(frame)
+    original = cv2.getNumThreads()
+    cpus = cv2.getNumberOfCPUs()
+    candidates = sorted({1, min(2, cpus), max(1, cpus // 2), cpus})
+    results = {}
+    try:
+        for threads in candidates:
+            cv2.setNumThreads(threads)
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                cv2.resize(frame[135:945, 240:1680], (1920, 1080), dst=zoomed, interpolation=cv2.INTER_LINEAR)
+                apply_filter(zoomed, "Sepia", filtered)
+                samples.append((time.perf_counter() - started) * 1000.0)
+            results[threads] = round(sorted(samples)[len(samples) // 2], 3)
+    finally:
+        cv2.setNumThreads(original)
+    return {"frame_ms_by_threads": results}
+
+
+def recommend(capture: dict, threads: dict) -> dict:
+    """El backend más rápido en fps sostenidos (desempata la latencia de apertura) y los hilos más rápidos."""
+    best, source = None, None
+    for target in capture.get("targets", []):
+        for run in target["runs"]:
+            if run["ok"] and (best is None or (run["fps"], -run["open_ms"]) > (best["fps"], -best["open_ms"])):
+                best, source = run, target["source"]
+    advice = {}
+    if best is not None:
+        advice["backend"] = best["backend"]
+        advice["measured_on"] = source
+        # OpenCV ordena los backends por prioridad; esta variable pone el elegido primero.
+        advice["backend_env"] = f"OPENCV_VIDEOIO_PRIORITY_{best['backend']}=1000"
+    timings = threads.get("frame_ms_by_threads", {})
+    if timings:
+        # Con menos de un 5 % de diferencia se prefieren menos hilos: dejan núcleos a la GUI y al grabador.
+        best_ms = min(timings.values())
+        fastest = min(count for count, ms in timings.items() if ms <= best_ms * 1.05)
+        advice["threads"] = fastest
+        advice["threads_env"] = f"OPENCV_FOR_THREADS_NUM={fastest}"
+    return advice
+
+
+def print_report(report: dict) -> None:
+    env = report["environment"]
+    print(f"Sesión gráfica detectada: {env['session']}")
+    print(f"QT_QPA_PLATFORM={env['qt_qpa_platform'] or '<no definida>'}")
+    for module, present in env["modules"].items():
+        print(f"{module}: {'disponible' if present else 'ausente'}")
+    opencv = report.get("opencv")
+    if opencv:
+        print(f"OpenCV {opencv['version']} · hilos {opencv['threads']} de {opencv['cpus']} CPU "
+              f"({opencv['parallel_framework'] or 'sin framework paralelo'})")
+        print("  Video I/O: " + ", ".join(f"{key} {value.split(' ')[0]}" for key, value in opencv["video_io"].items()
+                                           if value.split(" ")[0] in ("YES", "NO")))
+        print(f"  Backends de cámara: {', '.join(opencv['camera_backends']) or 'ninguno'}")
+        print(f"  SIMD base: {opencv['baseline'] or '?'} · despachado: {opencv['dispatched'] or '-'}")
+        print(f"  CPU: {' '.join(opencv['cpu_features']) or '?'} · optimizado: {'sí' if opencv['optimized'] else 'no'}")
+        if opencv["features_line"]:
+            print(f"  Compilado con: {opencv['features_line']}")
+    for target in report.get("capture", {}).get("targets", []):
+        print(f"Captura ({target['source']}):")
+        for run in target["runs"]:
+            if run["ok"]:
+                print(f"  {run['backend']:<10} apertura {run['open_ms']:.0f} ms · primer fotograma "
+                      f"{run['first_frame_ms']:.0f} ms · {run['fps']:.1f} fps ({run['size']})")
+            else:
+                print(f"  {run['backend']:<10} {run['error']}")
+    timings = report.get("threads", {}).get("frame_ms_by_threads", {})
+    if timings:
+        print("Zoom + filtro 1080p por hilos: " + ", ".join(f"{n}: {ms:.2f} ms" for n, ms in timings.items()))
+    advice = report.get("recommendation", {})
+    if "backend" in advice:
+        where = " (solo decodificación de un vídeo sintético)" if advice["measured_on"] == "synthetic" else ""
+        print(f"Backend recomendado{where}: {advice['backend']} (pruebe {advice['backend_env']})")
+    if "threads" in advice:
+        print(f"Hilos recomendados: {advice['threads']} (pruebe {advice['threads_env']})")
+    if not env["python_in_path"]:
         print("No se encontró un intérprete Python en PATH.")
-        return 1
     print("Si Qt falla en Wayland, pruebe QT_QPA_PLATFORM=xcb solo para esa ejecución.")
-    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Diagnóstico del entorno y del rendimiento de captura")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON para otras herramientas")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Segundos de lectura sostenida por backend")
+    parser.add_argument("--no-capture", action="store_true", help="No abrir cámaras ni medir backends")
+    args = parser.parse_args(argv)
+    report: dict = {"environment": environment_report()}
+    if report["environment"]["modules"]["cv2"] and report["environment"]["modules"]["numpy"]:
+        report["opencv"] = opencv_report()
+        if not args.no_capture:
+            report["capture"] = capture_report(args.seconds)
+            report["threads"] = thread_report()
+            report["recommendation"] = recommend(report["capture"], report["threads"])
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+    return 0 if report["environment"]["python_in_path"] else 1
 
 
 if __name__ == "__main__":
@@ -0,0 +1,277 @@
+"""Grabación asíncrona: cola acotada y un hilo escritor que mantiene la duración real del vídeo."""
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from bufferpool import BufferPool
+from settings import QUEUE_POLICIES
+
+# Nombres de las grabaciones de la GUI, el modo sin pantalla y el multicámara: la retención
+# no toca ningún otro archivo de la carpeta.
+RECORDING_PREFIXES = ("video-", "motion-")
+# Archivos que algún escritor de este proceso tiene abiertos; la retención nunca los borra.
+_open_paths: set[Path] = set()
+_open_lock = threading.Lock()
+DEFAULT_FPS = 24.0
+
+
+class AsyncVideoWriter:
+    """Envuelve ``cv2.VideoWriter`` en un hilo propio.
+
+    ``write`` nunca codifica: solo encola ``(marca, copia)``; la copia va a un búfer del
+    propio escritor, así que el llamador puede reutilizar su fotograma al volver. Con ``pace`` activo, el
+    hilo escritor duplica o descarta fotogramas según sus marcas monotónicas para que
+    cada segundo real ocupe exactamente ``fps`` fotogramas en el archivo.
+
+    Con ``segment_seconds`` o ``segment_bytes`` el hilo escritor rota a ``<nombre>-001.avi``,
+    ``-002``… entre dos fotogramas, sin perder ninguno. ``retain_bytes`` limita lo que
+    ocupan todas las grabaciones de la carpeta (segmentos, clips de movimiento, otras
+    sesiones): al abrir, al rotar y al cerrar se borran las más antiguas. ``timelapse`` conserva un fotograma cada
+    N segundos ya en ``write`` (``wants`` permite no procesar siquiera los demás).
+    """
+
+    def __init__(self, path: Path | str, size: tuple[int, int], fps: float = DEFAULT_FPS,
+                 fourcc: str = "XVID", max_queue: int = 64, policy: str = "drop_oldest",
+                 pace: bool = True, max_gap: float = 2.0, segment_seconds: float = 0.0,
+                 segment_bytes: int = 0, retain_bytes: int = 0, timelapse: float = 0.0) -> None:
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Política de cola desconocida: {policy}")
+        self.base = Path(path)
+        self.segment_seconds = segment_seconds
+        self.segment_bytes = segment_bytes
+        self.retain_bytes = retain_bytes
+        self.timelapse = timelapse
+        self.segmented = segment_seconds > 0 or segment_bytes > 0
+        self.segments: list[Path] = []
+        self.path = self._segment_path(1) if self.segmented else self.base
+        self.size = size
+        self.fps = fps if fps and fps > 0 else DEFAULT_FPS
+        self.fourcc = fourcc
+        self.max_queue = max(1, max_queue)
+        self.policy = policy
+        # En time-lapse el archivo se reproduce acelerado: no se rellena el tiempo real.
+        self.pace = pace and timelapse <= 0
+        self.max_gap = max_gap
+        self.received = 0
+        self.written = 0
+        self.duplicated = 0
+        self.decimated = 0
+        self.dropped = 0
+        self.prerolled = 0
+        self.skipped = 0
+        self.deleted = 0
+        self.error: str | None = None
+        self._queue: collections.deque = collections.deque()
+        # Con la cola al día bastan unos pocos búferes; los picos usan arrays sueltos.
+        self._buffers = BufferPool(per_shape=min(self.max_queue, 8) + 1)
+        self._cond = threading.Condition()
+        self._closing = False
+        self._origin: float | None = None
+        self._writer: cv2.VideoWriter | None = None
+        self._thread: threading.Thread | None = None
+        self._preroll: list[tuple[float, bytes]] = []
+        self._segment_frames = 0
+        self._last_kept: float | None = None
+        self.done = threading.Event()
+
+    def open(self, preroll: list[tuple[float, bytes]] | None = None) -> bool:
+        """Abre el archivo; ``preroll`` son ``(marca, jpeg)`` previos que el hilo escribe primero."""
+        self._preroll = list(preroll or [])
+        self._writer = self._open_segment()
+        if self._writer is None:
+            self.done.set()
+            return False
+        self._enforce_retention()
+        self._thread = threading.Thread(target=self._run, name=f"writer-{self.path.name}", daemon=True)
+        self._thread.start()
+        return True
+
+    def _segment_path(self, number: int) -> Path:
+        return self.base.with_name(f"{self.base.stem}-{number:03d}{self.base.suffix or '.avi'}")
+
+    def _open_segment(self) -> cv2.VideoWriter | None:
+        width, height = self.size
+        writer = cv2.VideoWriter(str(self.path), cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (width, height))
+        if not writer.isOpened():
+            return None
+        with _open_lock:
+            _open_paths.add(self.path.resolve())
+        self.segments.append(self.path)
+        self._segment_frames = 0
+        return writer
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def wants(self, stamp: float | None = None) -> bool:
+        """False si el time-lapse descartaría un fotograma con esta marca."""
+        if self.timelapse <= 0 or self._last_kept is None:
+            return True
+        stamp = time.monotonic() if stamp is None else stamp
+        return stamp - self._last_kept >= self.timelapse
+
+    def write(self, frame: np.ndarray, stamp: float | None = None) -> bool:
+        """Encola un fotograma; devuelve False si la política lo descartó."""
+        stamp = time.monotonic() if stamp is None else stamp
+        with self._cond:
+            if self._closing or self._writer is None:
+                return False
+            if not self.wants(stamp):
+                self.skipped += 1
+                return True
+            self._last_kept = stamp
+            self.received += 1
+            if len(self._queue) >= self.max_queue:
+                if self.policy == "drop_newest":
+                    self.dropped += 1
+                    return False
+                if self.policy == "drop_oldest":
+                    self._buffers.release(self._queue.popleft()[1])
+                    self.dropped += 1
+                else:
+                    while len(self._queue) >= self.max_queue and not self._closing:
+                        self._cond.wait(0.1)
+            copy = self._buffers.like(frame)
+            np.copyto(copy, frame)
+            self._queue.append((stamp, copy))
+            self._cond.notify_all()
+        return True
+
+    def close(self, wait: bool = False, timeout: float | None = None) -> bool:
+        """Pide al hilo que vacíe la cola y libere el archivo; ``done`` se activa al terminar."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if wait:
+            return self.done.wait(timeout)
+        return self.done.is_set()
+
+    def _copies(self, stamp: float) -> int:
+        if not self.pace:
+            return 1
+        if self._origin is None:
+            self._origin = stamp
+        target = int((stamp - self._origin) * self.fps) + 1
+        copies = target - self.written
+        limit = max(1, int(self.max_gap * self.fps))
+        if copies > limit:
+            # Tras una pausa larga (suspensión, cámara congelada) se reancla el origen.
+            self._origin = stamp - self.written / self.fps
+            copies = 1
+        return copies
+
+    def _should_rotate(self) -> bool:
+        if not self.segmented or self._segment_frames == 0:
+            return False
+        if self.segment_seconds > 0 and self._segment_frames >= self.segment_seconds * self.fps:
+            return True
+        # El tamaño solo se consulta una vez por segundo de vídeo: stat() no es gratis.
+        if self.segment_bytes > 0 and self._segment_frames % max(1, int(self.fps)) == 0:
+            try:
+                return self.path.stat().st_size >= self.segment_bytes
+            except OSError:
+                return False
+        return False
+
+    def _release_segment(self) -> None:
+        self._writer.release()
+        with _open_lock:
+            _open_paths.discard(self.path.resolve())
+
+    def _rotate(self) -> None:
+        self._release_segment()
+        self.path = self._segment_path(len(self.segments) + 1)
+        writer = self._open_segment()
+        if writer is None:
+            self._writer = None
+            raise OSError(f"No se pudo abrir el segmento {self.path}")
+        self._writer = writer
+        self._enforce_retention()
+
+    def _enforce_retention(self) -> None:
+        """Borra las grabaciones cerradas más antiguas de la carpeta hasta caber en ``retain_bytes``.
+
+        El último segmento de esta grabación nunca se borra, aunque por sí solo supere el tope.
+        """
+        if self.retain_bytes <= 0:
+            return
+        with _open_lock:
+            busy = set(_open_paths)
+        closed = []
+        for path in self.base.parent.glob(f"*{self.base.suffix or '.avi'}"):
+            if not path.name.startswith(RECORDING_PREFIXES) or path == self.path or path.resolve() in busy:
+                continue
+            try:
+                info = path.stat()
+            except OSError:
+                continue
+            closed.append((info.st_mtime, info.st_size, path))
+        total = sum(size for _, size, _ in closed)
+        for _, size, path in sorted(closed):
+            if total <= self.retain_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+                self.deleted += 1
+            except OSError:
+                continue
+
+    def _emit(self, stamp: float, frame: np.ndarray) -> None:
+        copies = self._copies(stamp)
+        if copies <= 0:
+            self.decimated += 1
+            return
+        for _ in range(copies):
+            if self._should_rotate():
+                self._rotate()
+            self._writer.write(frame)
+            self._segment_frames += 1
+        self.written += copies
+        self.duplicated += copies - 1
+
+    def _flush_preroll(self) -> None:
+        width, height = self.size
+        for stamp, data in self._preroll:
+            frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                continue
+            if frame.shape[1] != width or frame.shape[0] != height:
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_LINEAR)
+            self._emit(stamp, frame)
+        self.prerolled = len(self._preroll)
+        self._preroll = []
+
+    def _run(self) -> None:
+        try:
+            # La pre-grabación se decodifica aquí, mientras la GUI ya encola fotogramas en vivo.
+            self._flush_preroll()
+            while True:
+                with self._cond:
+                    while not self._queue and not self._closing:
+                        self._cond.wait()
+                    if not self._queue:
+                        break
+                    stamp, frame = self._queue.popleft()
+                    self._cond.notify_all()
+                try:
+                    self._emit(stamp, frame)
+                finally:
+                    self._buffers.release(frame)
+        except Exception as exc:  # Un fallo del códec no debe tumbar la GUI.
+            self.error = str(exc)
+            with self._cond:
+                self._closing = True
+                self._queue.clear()
+        finally:
+            if self._writer is not None:
+                self._release_segment()
+            self._enforce_retention()
+            self.done.set()
@@ -0,0 +1,186 @@
+"""Ruta de dibujo de la vista previa: un único redimensionado en OpenCV hacia un búfer reutilizado."""
+from __future__ import annotations
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+from PyQt6.QtCore import QRect, Qt
+from PyQt6.QtGui import QColor, QImage, QPainter, QPixmap
+from PyQt6.QtWidgets import QLabel, QWidget
+
+try:
+    from PyQt6.QtOpenGLWidgets import QOpenGLWidget
+except ImportError:  # PyQt6 sin el módulo OpenGL: se usa la superficie QPainter normal.
+    QOpenGLWidget = None
+
+
+def fit_size(width: int, height: int, bound_w: int, bound_h: int) -> tuple[int, int]:
+    scale = min(bound_w / float(width), bound_h / float(height))
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+class PreviewRenderer:
+    """Convierte fotogramas BGR en ``QImage`` del tamaño del widget sin conversión de color.
+
+    El búfer de salida solo se reserva de nuevo cuando cambia el tamaño del widget o del
+    fotograma; ``Format_BGR888`` lee los píxeles tal cual los entrega OpenCV.
+    """
+
+    def __init__(self, smooth: bool = True) -> None:
+        self.smooth = smooth
+        self._buffer: np.ndarray | None = None
+        self._key: tuple | None = None
+        self._size = (0, 0)
+
+    def render(self, frame: np.ndarray, bound_w: int, bound_h: int, overlay: str | None = None) -> QImage:
+        height, width = frame.shape[:2]
+        key = (width, height, bound_w, bound_h)
+        if key != self._key:
+            self._size = fit_size(width, height, max(1, bound_w), max(1, bound_h))
+            self._buffer = np.empty((self._size[1], self._size[0], 3), dtype=np.uint8)
+            self._key = key
+        target_w, target_h = self._size
+        if (target_w, target_h) == (width, height):
+            np.copyto(self._buffer, frame)
+        else:
+            # INTER_AREA solo compensa al reducir a la mitad o menos; en factores no enteros es lento.
+            halving = target_w * 2 <= width
+            interpolation = (cv2.INTER_AREA if halving else cv2.INTER_LINEAR) if self.smooth else cv2.INTER_NEAREST
+            cv2.resize(frame, (target_w, target_h), dst=self._buffer, interpolation=interpolation)
+        buffer = self._buffer
+        if overlay:
+            # Se dibuja en el búfer de la vista previa: nunca llega a fotos ni grabaciones.
+            for row, line in enumerate(overlay.split("\n")):
+                origin = (8, 20 + row * 18)
+                cv2.putText(buffer, line, origin, cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 0, 0), 3, cv2.LINE_AA)
+                cv2.putText(buffer, line, origin, cv2.FONT_HERSHEY_SIMPLEX, 0.45, (80, 255, 120), 1, cv2.LINE_AA)
+        return QImage(buffer.data, target_w, target_h, buffer.strides[0], QImage.Format.Format_BGR888)
+
+
+class _SurfaceMixin:
+    def _init_surface(self) -> None:
+        self._image: QImage | None = None
+        self._text = ""
+        self._background = QColor("#111722")
+
+    def setText(self, text: str) -> None:
+        self._text = text
+        self._image = None
+        self.update()
+
+    def show_image(self, image: QImage) -> None:
+        self._image = image
+        self.update()
+
+    def _paint(self, painter: QPainter) -> None:
+        painter.fillRect(self.rect(), self._background)
+        if self._image is None:
+            painter.setPen(QColor("#c8d1df"))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self._text)
+            return
+        x = (self.width() - self._image.width()) // 2
+        y = (self.height() - self._image.height()) // 2
+        painter.drawImage(QRect(x, y, self._image.width(), self._image.height()), self._image)
+
+
+class PreviewSurface(QWidget, _SurfaceMixin):
+    """Pinta el ``QImage`` directamente con QPainter, sin pasar por ``QPixmap``."""
+
+    def __init__(self, text: str = "", parent=None) -> None:
+        super().__init__(parent)
+        self._init_surface()
+        self._text = text
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        self._paint(painter)
+        painter.end()
+
+
+if QOpenGLWidget is not None:
+    class OpenGLPreviewSurface(QOpenGLWidget, _SurfaceMixin):
+        def __init__(self, text: str = "", parent=None) -> None:
+            super().__init__(parent)
+            self._init_surface()
+            self._text = text
+
+        def paintGL(self) -> None:
+            painter = QPainter(self)
+            self._paint(painter)
+            painter.end()
+else:
+    OpenGLPreviewSurface = None
+
+
+def create_preview(kind: str, text: str) -> QWidget:
+    if kind == "opengl" and OpenGLPreviewSurface is not None:
+        return OpenGLPreviewSurface(text)
+    if kind in ("painter", "opengl"):
+        return PreviewSurface(text)
+    label = QLabel(text)
+    label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    return label
+
+
+def show_frame(preview: QWidget, renderer: PreviewRenderer, frame: np.ndarray, overlay: str | None = None,
+               stats=None) -> None:
+    started = time.perf_counter()
+    image = renderer.render(frame, preview.width(), preview.height(), overlay)
+    converted = time.perf_counter()
+    if isinstance(preview, QLabel):
+        preview.setPixmap(QPixmap.fromImage(image))
+    else:
+        preview.show_image(image)
+    if stats is not None:
+        stats.record("convert", (converted - started) * 1000.0)
+        stats.record("display", (time.perf_counter() - converted) * 1000.0)
+
+
+def _legacy_cost(frame: np.ndarray, bound: tuple[int, int]) -> None:
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    image = QImage(rgb.data, rgb.shape[1], rgb.shape[0], rgb.strides[0], QImage.Format.Format_RGB888)
+    QPixmap.fromImage(image).scaled(bound[0], bound[1], Qt.AspectRatioMode.KeepAspectRatio,
+                                    Qt.TransformationMode.SmoothTransformation)
+
+
+def measure(size: tuple[int, int], bound: tuple[int, int], repeat: int = 50) -> dict:
+    """Coste medio por fotograma (ms) de la ruta original frente a la nueva, a un tamaño dado."""
+    frame = np.random.default_rng(0).integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+    renderer = PreviewRenderer()
+
+    def timed(func) -> float:
+        func()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000.0 / repeat
+
+    return {
+        "size": f"{size[0]}x{size[1]}",
+        "legacy_ms": round(timed(lambda: _legacy_cost(frame, bound)), 3),
+        "label_ms": round(timed(lambda: QPixmap.fromImage(renderer.render(frame, *bound))), 3),
+        "painter_ms": round(timed(lambda: renderer.render(frame, *bound)), 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    from PyQt6.QtGui import QGuiApplication
+
+    parser = argparse.ArgumentParser(description="Coste de la vista previa por fotograma: antes y después")
+    parser.add_argument("--bound", default="960x600", help="Tamaño del widget de vista previa")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+    app = QGuiApplication.instance() or QGuiApplication([])
+    bound = tuple(int(part) for part in args.bound.lower().split("x"))
+    print(f"{'Fotograma':<12}{'Original ms':>12}{'QLabel ms':>12}{'QPainter ms':>13}")
+    for size in ((640, 480), (1280, 720), (1920, 1080)):
+        row = measure(size, bound, args.repeat)
+        print(f"{row['size']:<12}{row['legacy_ms']:>12.3f}{row['label_ms']:>12.3f}{row['painter_ms']:>13.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
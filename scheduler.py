@@ -0,0 +1,105 @@
+"""Presupuesto por fotograma: recorta trabajo opcional cuando la GUI no llega y lo devuelve al sobrar margen.
+
+Cada nivel suma un recorte al anterior, en este orden: detectar rostros con menos
+frecuencia, escalar la vista previa sin suavizado y mostrar solo uno de cada N
+fotogramas. Grabación, movimiento y transmisión no dependen del nivel: ningún
+fotograma grabado se pierde por degradar la vista previa.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Level:
+    name: str
+    detect_scale: int = 1
+    smooth: bool = True
+    preview_every: int = 1
+
+
+LEVELS = (
+    Level("completo"),
+    Level("detección ÷2", detect_scale=2),
+    Level("detección ÷4", detect_scale=4),
+    Level("vista previa rápida", detect_scale=4, smooth=False),
+    Level("vista previa ½", detect_scale=4, smooth=False, preview_every=2),
+    Level("vista previa ⅓", detect_scale=4, smooth=False, preview_every=3),
+)
+
+
+class FrameScheduler:
+    """Compara el coste medio (media exponencial) de cada fotograma con ``budget_ms``.
+
+    Sube un nivel si el coste supera el presupuesto durante ``degrade_after`` segundos y
+    baja uno si queda por debajo de ``restore_ratio`` × presupuesto durante
+    ``restore_after`` segundos; la espera asimétrica evita oscilar entre dos niveles.
+    """
+
+    def __init__(self, budget_ms: float = 33.3, degrade_after: float = 0.5, restore_after: float = 3.0,
+                 restore_ratio: float = 0.6, alpha: float = 0.2, enabled: bool = True) -> None:
+        self.budget_ms = budget_ms
+        self.degrade_after = degrade_after
+        self.restore_after = restore_after
+        self.restore_ratio = restore_ratio
+        self.alpha = alpha
+        self.enabled = enabled
+        self.level = 0
+        self.cost_ms = 0.0
+        self.changes = 0
+        self._over_since: float | None = None
+        self._under_since: float | None = None
+        self._shown = 0
+
+    @property
+    def current(self) -> Level:
+        return LEVELS[self.level]
+
+    @property
+    def label(self) -> str:
+        return f"nivel {self.level} ({self.current.name})"
+
+    def set_fps(self, fps: float) -> None:
+        """El presupuesto por defecto es el intervalo entre fotogramas de la cámara."""
+        if fps > 0:
+            self.budget_ms = 1000.0 / fps
+
+    def reset(self) -> None:
+        self.level = 0
+        self.cost_ms = 0.0
+        self._over_since = self._under_since = None
+
+    def show_preview(self) -> bool:
+        """Decide si este fotograma llega a la vista previa según el nivel actual."""
+        self._shown += 1
+        return self._shown % self.current.preview_every == 0
+
+    def record(self, elapsed_ms: float, now: float | None = None) -> bool:
+        """Registra el coste de un fotograma; devuelve True si el nivel cambió."""
+        self.cost_ms = elapsed_ms if self.cost_ms == 0.0 else self.cost_ms + self.alpha * (elapsed_ms - self.cost_ms)
+        if not self.enabled:
+            return False
+        now = time.monotonic() if now is None else now
+        if self.cost_ms > self.budget_ms:
+            self._under_since = None
+            if self._over_since is None:
+                self._over_since = now
+            elif now - self._over_since >= self.degrade_after and self.level < len(LEVELS) - 1:
+                return self._change(self.level + 1)
+        elif self.cost_ms < self.budget_ms * self.restore_ratio:
+            self._over_since = None
+            if self._under_since is None:
+                self._under_since = now
+            elif now - self._under_since >= self.restore_after and self.level > 0:
+                return self._change(self.level - 1)
+        else:
+            self._over_since = self._under_since = None
+        return False
+
+    def _change(self, level: int) -> bool:
+        self.level = level
+        self.changes += 1
+        # Cada cambio se evalúa desde cero con el trabajo que le corresponde al nuevo nivel.
+        self._over_since = self._under_since = None
+        return True
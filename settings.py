@@ -0,0 +1,92 @@
+"""Constantes de la aplicación y lectura/escritura atómica de config/settings.json.
+
+``config/settings.json`` se distribuye con la aplicación (y lo reemplaza el actualizador);
+lo que se aprende en tiempo de ejecución (caché de cámaras, perfiles) va a ``STATE_PATH``,
+un archivo por usuario fuera del paquete.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+APP_NAME = "Universal Camera Pro"
+PHOTO_DIR = Path.home() / "Pictures" / "UniversalCamera"
+VIDEO_DIR = Path.home() / "Videos" / "UniversalCamera"
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+PREVIEW_SURFACES = ("label", "painter", "opengl")
+PHOTO_FORMATS = ("jpg", "png", "webp")
+QUEUE_POLICIES = ("block", "drop_oldest", "drop_newest")
+CONFIG_PATH = Path(__file__).resolve().parent / "config" / "settings.json"
+
+
+def _state_dir() -> Path:
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Application Support"
+    else:
+        base = Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state")
+    return base / "UniversalCamera"
+
+
+STATE_PATH = Path(os.environ.get("UNIVERSAL_CAMERA_STATE") or _state_dir() / "state.json")
+_lock = threading.Lock()
+
+
+def _read_umask() -> int:
+    # os.umask solo se puede leer cambiándola; se hace una vez al importar, antes de crear hilos.
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+_UMASK = _read_umask()
+
+
+def set_default_mode(fd: int) -> None:
+    """``mkstemp`` crea archivos 0600; tras ``os.replace`` deben quedar como los de ``open()``."""
+    if hasattr(os, "fchmod"):
+        os.fchmod(fd, 0o666 & ~_UMASK)
+
+
+def load_settings(path: Path = CONFIG_PATH) -> dict:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def get_setting(key: str, default=None, path: Path = CONFIG_PATH):
+    return load_settings(path).get(key, default)
+
+
+def update_settings(values: dict, path: Path = CONFIG_PATH) -> bool:
+    """Fusiona ``values`` en el archivo; devuelve False si no se pudo escribir (p. ej. solo lectura)."""
+    with _lock:
+        data = load_settings(path)
+        data.update(values)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=path.parent, prefix=".settings-", suffix=".tmp")
+            set_default_mode(fd)
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(data, handle, indent=2, ensure_ascii=False)
+                handle.write("\n")
+            os.replace(temp, path)
+        except OSError:
+            return False
+    return True
+
+
+def get_state(key: str, default=None):
+    return get_setting(key, default, STATE_PATH)
+
+
+def update_state(values: dict) -> bool:
+    return update_settings(values, STATE_PATH)
@@ -0,0 +1,204 @@
+"""Fuentes de fotogramas intercambiables: cámara, archivo de vídeo o carpeta de imágenes.
+
+Todas imitan la parte de ``cv2.VideoCapture`` que usa la aplicación (``read``,
+``isOpened``, ``release``, ``get``), así que ``CaptureWorker`` y el modo sin pantalla
+las aceptan sin cambios. Los archivos se leen fotograma a fotograma, nunca enteros.
+"""
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff")
+VIDEO_EXTENSIONS = (".avi", ".mp4", ".mkv", ".mov", ".m4v", ".webm", ".mjpg", ".mpg")
+DEFAULT_FPS = 30.0
+
+
+class FrameSource(ABC):
+    """Base común: ``position`` es el tiempo de fuente del último fotograma, en segundos.
+
+    ``live`` indica si el reloj lo marca el mundo (cámara o URL) o el propio archivo.
+    Con ``realtime`` una fuente grabada entrega al ritmo de su fps; si no, tan rápido
+    como se lea. ``loop`` vuelve al principio al agotarse sin reiniciar ``position``.
+    """
+
+    live = False
+
+    def __init__(self, realtime: bool = False, loop: bool = False) -> None:
+        self.realtime = realtime
+        self.loop = loop
+        self.frames = 0
+        self.position = 0.0
+        self._started: float | None = None
+
+    @property
+    def fps(self) -> float:
+        return DEFAULT_FPS
+
+    def isOpened(self) -> bool:  # noqa: N802 - misma firma que cv2.VideoCapture
+        return False
+
+    def release(self) -> None:
+        pass
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0.0
+
+    def set(self, prop: int, value: float) -> bool:
+        return False
+
+    @abstractmethod
+    def _grab(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        """Lee el siguiente fotograma (en ``image`` si se puede); ``(False, None)`` al agotarse."""
+
+    def _rewind(self) -> bool:
+        return False
+
+    def read(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        ok, frame = self._grab(image)
+        if not ok and self.loop and self.frames and self._rewind():
+            ok, frame = self._grab(image)
+        if not ok:
+            return False, None
+        self.position = self.frames / self.fps if self.fps > 0 else 0.0
+        self.frames += 1
+        if self.realtime:
+            if self._started is None:
+                self._started = time.monotonic()
+            wait = self._started + self.position - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+        return True, frame
+
+
+class DeviceSource(FrameSource):
+    """Cámara o URL en vivo; ``position`` son segundos de reloj desde la apertura."""
+
+    live = True
+
+    def __init__(self, target: int | str) -> None:
+        super().__init__(realtime=True)
+        self.cap = cv2.VideoCapture(target)
+        self._opened = time.monotonic()
+
+    @property
+    def fps(self) -> float:
+        return self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+
+    def isOpened(self) -> bool:  # noqa: N802
+        return self.cap.isOpened()
+
+    def release(self) -> None:
+        self.cap.release()
+
+    def get(self, prop: int) -> float:
+        return self.cap.get(prop)
+
+    def set(self, prop: int, value: float) -> bool:
+        return self.cap.set(prop, value)
+
+    def _grab(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        return self.cap.read(image) if image is not None else self.cap.read()
+
+    def read(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        # El reloj lo marca la cámara: sin la espera ni la posición por fps de la base.
+        ok, frame = self._grab(image)
+        if ok:
+            self.frames += 1
+            self.position = time.monotonic() - self._opened
+        return ok, frame
+
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path: Path | str, realtime: bool = False, loop: bool = False) -> None:
+        super().__init__(realtime, loop)
+        self.path = Path(path)
+        self.cap = cv2.VideoCapture(str(self.path))
+        self._fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+
+    @property
+    def fps(self) -> float:
+        return self._fps if self._fps > 0 else DEFAULT_FPS
+
+    def isOpened(self) -> bool:  # noqa: N802
+        return self.cap.isOpened()
+
+    def release(self) -> None:
+        self.cap.release()
+
+    def get(self, prop: int) -> float:
+        return self.fps if prop == cv2.CAP_PROP_FPS else self.cap.get(prop)
+
+    def _grab(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        return self.cap.read(image) if image is not None else self.cap.read()
+
+    def _rewind(self) -> bool:
+        return self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+
+class ImageDirectorySource(FrameSource):
+    """Imágenes de una carpeta en orden alfabético, decodificadas una a una a ``fps`` nominales."""
+
+    def __init__(self, path: Path | str, fps: float = DEFAULT_FPS, realtime: bool = False, loop: bool = False) -> None:
+        super().__init__(realtime, loop)
+        self.path = Path(path)
+        self._fps = fps
+        self.files = sorted(p for p in self.path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS) \
+            if self.path.is_dir() else []
+        self._index = 0
+
+    @property
+    def fps(self) -> float:
+        return self._fps
+
+    def isOpened(self) -> bool:  # noqa: N802
+        return bool(self.files)
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.files))
+        return super().get(prop)
+
+    def _grab(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        while self._index < len(self.files):
+            frame = cv2.imread(str(self.files[self._index]), cv2.IMREAD_COLOR)
+            self._index += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def _rewind(self) -> bool:
+        self._index = 0
+        return True
+
+
+def open_source(spec: str | int, realtime: bool = False, loop: bool = False, fps: float = DEFAULT_FPS) -> FrameSource:
+    """Un número es un índice de cámara, una carpeta son imágenes, una URL es en vivo y el resto un archivo."""
+    if isinstance(spec, int) or str(spec).isdigit():
+        return DeviceSource(int(spec))
+    text = str(spec)
+    if "://" in text:
+        return DeviceSource(text)
+    path = Path(text)
+    if path.is_dir():
+        return ImageDirectorySource(path, fps, realtime, loop)
+    return VideoFileSource(path, realtime, loop)
+
+
+def expand_inputs(specs: list[str]) -> list[str]:
+    """Expande carpetas que contienen vídeos a sus archivos; una carpeta solo de imágenes es una fuente."""
+    expanded = []
+    for spec in specs:
+        path = Path(spec)
+        videos = sorted(p for p in path.iterdir() if p.suffix.lower() in VIDEO_EXTENSIONS) if path.is_dir() else []
+        if videos:
+            expanded.extend(str(video) for video in videos)
+        else:
+            expanded.append(spec)
+    return expanded
@@ -0,0 +1,230 @@
+"""Servidor MJPEG (``multipart/x-mixed-replace``) para ver la cámara desde otros equipos de la red."""
+from __future__ import annotations
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+from bufferpool import BufferPool
+
+BOUNDARY = "frame"
+INDEX_PAGE = """<!doctype html><html><head><meta charset="utf-8"><title>{title}</title></head>
+<body style="margin:0;background:#111"><img src="/stream.mjpg" style="width:100%;height:auto"></body></html>
+"""
+
+
+class FrameBroadcaster:
+    """Codifica cada fotograma una sola vez, sin importar cuántos clientes haya.
+
+    ``offer`` deja el fotograma en una ranura "el más reciente gana" y un hilo lo pasa a
+    JPEG solo si hay clientes. Cada cliente espera con ``wait_next`` al siguiente número
+    de secuencia: si va lento, recibe directamente el último y se salta los intermedios,
+    así que la memoria por cliente es un único JPEG. La ranura guarda una copia en un
+    búfer propio: el llamador puede reutilizar su fotograma en cuanto ``offer`` vuelve.
+    """
+
+    def __init__(self, quality: int = 80, max_fps: float = 25.0, max_width: int = 1280) -> None:
+        self.quality = quality
+        self.max_fps = max_fps
+        self.max_width = max_width
+        self.clients = 0
+        self.encoded = 0
+        self.skipped = 0
+        self._slot: np.ndarray | None = None
+        self._buffers = BufferPool(per_shape=3)
+        self._seq = 0
+        self._jpeg: bytes | None = None
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "FrameBroadcaster":
+        if self._thread is None:
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="mjpeg-encoder", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def offer(self, frame: np.ndarray) -> None:
+        with self._cond:
+            if not self.clients:
+                return
+            if self._slot is not None:
+                self.skipped += 1
+                self._buffers.release(self._slot)
+            self._slot = self._buffers.like(frame)
+            np.copyto(self._slot, frame)
+            self._cond.notify_all()
+
+    def latest(self) -> tuple[int, bytes | None]:
+        with self._cond:
+            return self._seq, self._jpeg
+
+    def wait_next(self, after: int, timeout: float = 5.0) -> tuple[int, bytes | None]:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._seq <= after and not self._stop:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return self._seq, self._jpeg
+
+    def attach(self) -> None:
+        with self._cond:
+            self.clients += 1
+
+    def detach(self) -> None:
+        with self._cond:
+            self.clients = max(0, self.clients - 1)
+
+    def _run(self) -> None:
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        interval = 1.0 / self.max_fps if self.max_fps > 0 else 0.0
+        last = 0.0
+        while True:
+            with self._cond:
+                while self._slot is None and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                frame, self._slot = self._slot, None
+            wait = last + interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+                with self._cond:
+                    # Durante la espera pudo llegar un fotograma más nuevo.
+                    if self._slot is not None:
+                        self._buffers.release(frame)
+                        frame, self._slot = self._slot, None
+            last = time.monotonic()
+            ok, data = self._encode(frame, params)
+            if not ok:
+                continue
+            with self._cond:
+                self._jpeg = data.tobytes()
+                self._seq += 1
+                self.encoded += 1
+                self._cond.notify_all()
+
+    def _encode(self, frame: np.ndarray, params: list[int]) -> tuple[bool, np.ndarray]:
+        try:
+            width = frame.shape[1]
+            if self.max_width and width > self.max_width:
+                scale = self.max_width / width
+                return cv2.imencode(".jpg", cv2.resize(frame, None, fx=scale, fy=scale,
+                                                       interpolation=cv2.INTER_AREA), params)
+            return cv2.imencode(".jpg", frame, params)
+        finally:
+            self._buffers.release(frame)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "UniversalCameraMJPEG/1.0"
+    # Un cliente que deja de leer libera su hilo en vez de retenerlo para siempre.
+    timeout = 10.0
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        broadcaster: FrameBroadcaster = self.server.broadcaster
+        path = self.path.split("?", 1)[0]
+        if path in ("/", "/index.html"):
+            body = INDEX_PAGE.format(title=self.server.title).encode("utf-8")
+            self._send_headers("text/html; charset=utf-8", len(body))
+            self.wfile.write(body)
+        elif path == "/snapshot.jpg":
+            broadcaster.attach()
+            try:
+                _, data = broadcaster.wait_next(broadcaster.latest()[0])
+            finally:
+                broadcaster.detach()
+            if data is None:
+                self.send_error(503, "Sin fotogramas todavía")
+                return
+            self._send_headers("image/jpeg", len(data))
+            self.wfile.write(data)
+        elif path == "/stream.mjpg":
+            self._stream(broadcaster)
+        else:
+            self.send_error(404)
+
+    def _send_headers(self, content_type: str, length: int | None = None) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Cache-Control", "no-store")
+        if length is not None:
+            self.send_header("Content-Length", str(length))
+        self.end_headers()
+
+    def _stream(self, broadcaster: FrameBroadcaster) -> None:
+        self._send_headers(f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        broadcaster.attach()
+        seq = 0
+        try:
+            while not self.server.stopping:
+                latest, data = broadcaster.wait_next(seq, timeout=1.0)
+                if latest == seq or data is None:
+                    continue
+                seq = latest
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(data)}\r\n\r\n"
+                                 .encode("ascii"))
+                self.wfile.write(data)
+                self.wfile.write(b"\r\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, TimeoutError):
+            pass
+        finally:
+            broadcaster.detach()
+
+
+class MjpegServer:
+    """``ThreadingHTTPServer`` con ``/`` (página), ``/stream.mjpg`` y ``/snapshot.jpg``; ``port=0`` elige uno libre."""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8080, title: str = "Camera", **encoder) -> None:
+        self.broadcaster = FrameBroadcaster(**encoder)
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.broadcaster = self.broadcaster
+        self.httpd.title = title
+        self.httpd.stopping = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self.httpd.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        host, port = self.address
+        return f"http://{'127.0.0.1' if host == '0.0.0.0' else host}:{port}/"
+
+    def offer(self, frame: np.ndarray) -> None:
+        self.broadcaster.offer(frame)
+
+    def start(self) -> "MjpegServer":
+        self.broadcaster.start()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mjpeg-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.stopping = True
+        self.broadcaster.stop()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
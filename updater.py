@@ -7,14 +7,23 @@ This template is used when creating new projects.
 
 import sys
 import os
+import glob
+import json
+import hashlib
+import tempfile
+import random
 import time
 import shutil
+import stat
 import zipfile
 import subprocess
 import traceback
 import threading
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed, wait
+from contextlib import contextmanager
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 
 # requests con fallback a urllib
 try:
@@ -74,7 +83,31 @@ except (ImportError, SyntaxError):
 XML_PATH = "details.xml"
 LOG_PATH = "updater_log.txt"
 CHECK_INTERVAL = 60
-GITHUB_API = "https://api.github.com"
+# Bases configurables por entorno: permiten probar contra un servidor local de reemplazo.
+GITHUB_API = os.environ.get("UPDATER_GITHUB_API", "https://api.github.com")
+GITHUB_WEB = os.environ.get("UPDATER_GITHUB_WEB", "https://github.com")
+RAW_BASE = os.environ.get("UPDATER_RAW_BASE", "https://raw.githubusercontent.com")
+VALIDATORS_PATH = "updater_cache.json"
+MAX_BACKOFF = 3600
+PROBE_DEADLINE = 10.0
+PROBE_WORKERS = 6
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Shared requests.Session with a connection pool (None without requests)."""
+    global _session
+    if requests is None:
+        return None
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=PROBE_WORKERS)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session.headers["User-Agent"] = "PackageMaker-Updater"
+    return _session
 
 def log(msg):
     """Log message to file and console."""
@@ -99,29 +132,114 @@ def leer_xml(path):
         }
     except: return {}
 
-def leer_xml_remoto(author, app):
-    """Read remote version from GitHub."""
-    url = f"https://raw.githubusercontent.com/{author}/{app}/main/details.xml"
+def _cargar_validadores():
+    try:
+        with open(VALIDATORS_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except: return {}
+
+def _guardar_validadores(data):
+    # Escritura atómica: un corte a mitad no debe dejar el caché ilegible.
+    try:
+        tmp = f"{VALIDATORS_PATH}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, VALIDATORS_PATH)
+    except Exception as e:
+        log(f"[POLL] No se pudo guardar el caché de validadores: {e}")
+
+def _retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+def consultar_xml_remoto(author, app):
+    """Conditional GET of the remote details.xml.
+
+    Returns (state, version, retry_after) where state is "changed", "not_modified",
+    "rate_limited" or "error". ETag/Last-Modified are cached on disk across restarts.
+    """
+    url = f"{RAW_BASE}/{author}/{app}/main/details.xml"
+    cache = _cargar_validadores()
+    entry = cache.get(url, {})
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
     try:
         if requests:
-            r = requests.get(url, timeout=10)
-            if r.status_code == 200:
-                return ET.fromstring(r.text).findtext("version", "").strip()
+            r = get_session().get(url, timeout=10, headers=headers)
+            status, resp_headers, body = r.status_code, r.headers, r.text if r.status_code == 200 else ""
         else:
-            # Fallback usando urllib
+            # Fallback usando urllib (un 304 llega como HTTPError)
             import urllib.request
-            with urllib.request.urlopen(url, timeout=10) as response:
-                if response.status == 200:
-                    content = response.read().decode('utf-8')
-                    return ET.fromstring(content).findtext("version", "").strip()
-    except: pass
-    return ""
+            import urllib.error
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=10) as response:
+                    status, resp_headers = response.status, response.headers
+                    body = response.read().decode('utf-8')
+            except urllib.error.HTTPError as e:
+                status, resp_headers, body = e.code, e.headers, ""
+    except Exception as e:
+        log(f"[POLL] Error consultando {url}: {e}")
+        return "error", "", None
+    if status == 304:
+        return "not_modified", entry.get("version", ""), None
+    if status in (429, 403, 503):
+        return "rate_limited", "", _retry_after(resp_headers.get("Retry-After"))
+    if status != 200:
+        return "error", "", _retry_after(resp_headers.get("Retry-After"))
+    try:
+        version = ET.fromstring(body).findtext("version", "").strip()
+    except ET.ParseError:
+        return "error", "", None
+    cache[url] = {"etag": resp_headers.get("ETag"), "last_modified": resp_headers.get("Last-Modified"),
+                  "version": version}
+    _guardar_validadores(cache)
+    return "changed", version, None
+
+def leer_xml_remoto(author, app):
+    """Read remote version from GitHub."""
+    state, version, _ = consultar_xml_remoto(author, app)
+    return version if state in ("changed", "not_modified") else ""
+
+class PollScheduler:
+    """Delay until the next check: CHECK_INTERVAL with jitter, exponential backoff on failures."""
 
-def _check_url_exists(url):
+    def __init__(self, interval=CHECK_INTERVAL, max_delay=MAX_BACKOFF, jitter=0.1):
+        self.interval = interval
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.failures = 0
+
+    def next_delay(self, state, retry_after=None):
+        if state in ("changed", "not_modified"):
+            self.failures = 0
+            # ±10 %: instalaciones arrancadas a la vez se desincronizan solas.
+            return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        self.failures += 1
+        cap = min(self.max_delay, self.interval * 2 ** self.failures)
+        # "Full jitter": cualquier punto entre el intervalo base y el tope exponencial.
+        delay = random.uniform(self.interval, max(self.interval, cap))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return min(delay, max(self.max_delay, retry_after or 0))
+
+def _check_url_exists(url, timeout=15):
     """Check if URL exists (HEAD request)."""
     if requests:
         try:
-            r = requests.head(url, timeout=15, allow_redirects=True)
+            r = get_session().head(url, timeout=timeout, allow_redirects=True)
             return r.status_code == 200
         except: pass
     else:
@@ -129,22 +247,123 @@ def _check_url_exists(url):
         try:
             import urllib.request
             req = urllib.request.Request(url, method='HEAD')
-            with urllib.request.urlopen(req, timeout=15) as response:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
                 return response.status == 200
         except: pass
     return False
 
-def buscar_release(author, app, version, platform, publisher):
+def probe_urls(urls, deadline=PROBE_DEADLINE):
+    """HEAD all candidates concurrently; return the preferred (earliest in list) one that exists.
+
+    Results are consumed as they complete: a hit is returned once every better-ranked
+    candidate has answered, and at the deadline the best hit so far wins, so a candidate
+    that hangs cannot hide the ones after it.
+    """
+    if not urls:
+        return None
+    pool = ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(urls)), thread_name_prefix="probe")
+    futures = {pool.submit(_check_url_exists, url, min(15, deadline)): i for i, url in enumerate(urls)}
+    answered = [False] * len(urls)
+    best = None
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            i = futures[future]
+            answered[i] = True
+            try:
+                if future.result() and (best is None or i < best):
+                    best = i
+            except Exception:
+                pass
+            if best is not None and all(answered[:best]):
+                break
+    except FuturesTimeout:
+        pass
+    finally:
+        # No se espera a las sondas restantes: el plazo global manda.
+        pool.shutdown(wait=False, cancel_futures=True)
+    return urls[best] if best is not None else None
+
+def probe_existing(urls, deadline=PROBE_DEADLINE):
+    """HEAD all candidates concurrently; return the set that answered 200 before the deadline."""
+    pool = ThreadPoolExecutor(max_workers=max(1, min(PROBE_WORKERS, len(urls))), thread_name_prefix="probe")
+    try:
+        futures = {pool.submit(_check_url_exists, url, min(15, deadline)): url for url in urls}
+        done, _ = wait(futures, timeout=deadline)
+        return {futures[f] for f in done if not f.exception() and f.result()}
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _rate_limit_wait(headers):
+    """Retry-After, or the wait until X-RateLimit-Reset once GitHub's quota is exhausted."""
+    wait = _retry_after(headers.get("Retry-After"))
+    if wait is None and headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            wait = max(0.0, float(headers.get("X-RateLimit-Reset")) - time.time())
+        except (TypeError, ValueError):
+            pass
+    return wait
+
+def consultar_assets(author, app, version):
+    """Conditional GET of a release's asset list (name -> download URL).
+
+    Returns (state, assets, retry_after) with the states of consultar_xml_remoto plus
+    "missing" (no release for that tag yet). The listing is cached with its ETag: GitHub
+    does not count a 304 against the API rate limit.
+    """
+    url = f"{GITHUB_API}/repos/{author}/{app}/releases/tags/{version}"
+    cache = _cargar_validadores()
+    entry = cache.get(url, {})
+    headers = {"Accept": "application/vnd.github+json"}
+    if entry.get("etag") and "assets" in entry:
+        headers["If-None-Match"] = entry["etag"]
+    try:
+        if requests:
+            r = get_session().get(url, timeout=10, headers=headers)
+            status, resp_headers, body = r.status_code, r.headers, r.text if r.status_code == 200 else ""
+        else:
+            import urllib.request
+            import urllib.error
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=10) as response:
+                    status, resp_headers = response.status, response.headers
+                    body = response.read().decode("utf-8")
+            except urllib.error.HTTPError as e:
+                status, resp_headers, body = e.code, e.headers, ""
+    except Exception as e:
+        log(f"[POLL] Error consultando {url}: {e}")
+        return "error", None, None
+    if status == 304 and "assets" in entry:
+        return "not_modified", entry["assets"], None
+    if status in (429, 403, 503):
+        return "rate_limited", None, _rate_limit_wait(resp_headers)
+    if status == 404:
+        return "missing", None, None
+    if status != 200:
+        return "error", None, _retry_after(resp_headers.get("Retry-After"))
+    try:
+        assets = {a["name"]: a["browser_download_url"] for a in json.loads(body).get("assets", [])}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return "error", None, None
+    cache[url] = {"etag": resp_headers.get("ETag"), "assets": assets}
+    _guardar_validadores(cache)
+    return "changed", assets, None
+
+def listar_assets(author, app, version):
+    """Asset name -> download URL for a release tag (one API call), or None if unavailable."""
+    return consultar_assets(author, app, version)[1]
+
+def _download_url(author, app, version, filename):
+    return f"{GITHUB_WEB}/{author}/{app}/releases/download/{version}/{filename}"
+
+def buscar_release(author, app, version, platform, publisher, assets=None):
     """Search for .iflapp release file."""
     filename = f"{publisher}.{app}.{version}-{platform}.iflapp"
-    url = f"https://github.com/{author}/{app}/releases/download/{version}/{filename}"
-    if _check_url_exists(url):
-        return url
-    return None
+    if assets is not None:
+        return assets.get(filename)
+    return probe_urls([_download_url(author, app, version, filename)])
 
-def buscar_release_exe(author, app, version, platform, publisher):
-    """Search for .exe setup file."""
-    exe_patterns = [
+def exe_candidates(app, version, platform, publisher):
+    return [
         f"{publisher}.{app}-{version}-{platform}.exe",
         f"{publisher}.{app}.{version}-{platform}.exe",
         f"{publisher}-{app}-{version}-{platform}.exe",
@@ -152,15 +371,107 @@ def buscar_release_exe(author, app, version, platform, publisher):
         f"{publisher}.{app}-Setup-{version}.exe",
         f"{app}-Setup-{version}.exe",
     ]
-    for filename in exe_patterns:
-        url = f"https://github.com/{author}/{app}/releases/download/{version}/{filename}"
-        if _check_url_exists(url):
-            log(f"[EXE] Setup encontrado: {filename}")
-            return url, filename
+
+def buscar_release_exe(author, app, version, platform, publisher, assets=None):
+    """Search for .exe setup file."""
+    exe_patterns = exe_candidates(app, version, platform, publisher)
+    if assets is not None:
+        filename = next((name for name in exe_patterns if name in assets), None)
+        url = assets.get(filename) if filename else None
+    else:
+        urls = [_download_url(author, app, version, name) for name in exe_patterns]
+        url = probe_urls(urls)
+        filename = exe_patterns[urls.index(url)] if url else None
+    if url:
+        log(f"[EXE] Setup encontrado: {filename}")
+        return url, filename
     return None, None
 
+def buscar_actualizacion(datos, version):
+    """Locate the .exe and .iflapp of a release: one asset listing, concurrent probing as fallback.
+
+    Returns (exe_url, exe_name, url, state, retry_after). When the .iflapp is not found,
+    state says why ("missing", "rate_limited", "error") so PollScheduler backs off.
+    """
+    state, assets, retry_after = consultar_assets(datos["author"], datos["app"], version)
+    listed = assets is not None
+    if not listed:
+        log(f"[UPDATE] Lista de assets no disponible ({state}); sondeando nombres en paralelo")
+        exe_file = exe_candidates(datos["app"], version, datos["platform"], datos["publisher"])
+        ifl = f"{datos['publisher']}.{datos['app']}.{version}-{datos['platform']}.iflapp"
+        urls = [_download_url(datos["author"], datos["app"], version, name) for name in [*exe_file, ifl]]
+        # Una sola tanda concurrente para los siete candidatos, con el mismo plazo global.
+        found = probe_existing(urls)
+        assets = {name: url for name, url in zip([*exe_file, ifl], urls) if url in found}
+    exe_url, exe_name = buscar_release_exe(datos["author"], datos["app"], version, datos["platform"],
+                                           datos["publisher"], assets)
+    url = buscar_release(datos["author"], datos["app"], version, datos["platform"], datos["publisher"], assets)
+    if url:
+        return exe_url, exe_name, url, "changed", None
+    # Con la lista en mano, que falte el .iflapp es "aún no publicado", no un fallo de red.
+    return exe_url, exe_name, None, "missing" if listed else state, retry_after
+
+def sha256_file(path, chunk=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _safe_target(name, root="."):
+    """Destination for a zip entry, or None if it would escape root (zip-slip)."""
+    if name.startswith(("/", "\\")) or ":" in name.split("/")[0]:
+        return None
+    base = os.path.abspath(root)
+    dst = os.path.abspath(os.path.join(base, name))
+    return dst if dst.startswith(base + os.sep) else None
+
+def _read_umask():
+    # os.umask solo se puede leer cambiándola y es global al proceso: una vez al importar,
+    # antes de que existan los hilos de descarga e instalación.
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+_UMASK = _read_umask()
+
+def _default_mode():
+    """0o666 minus the process umask: the mode open() would give a new file."""
+    return 0o666 & ~_UMASK
+
+@contextmanager
+def _abrir_descarga(url, headers):
+    """Streaming GET; yields (status, headers, chunks) and always closes the response."""
+    if requests:
+        with get_session().get(url, stream=True, headers=headers, timeout=30) as r:
+            yield r.status_code, r.headers, r.iter_content(65536)
+        return
+    # Fallback usando urllib (los 4xx/5xx llegan como HTTPError, que también es una respuesta)
+    import urllib.request
+    import urllib.error
+    try:
+        response = urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=60)
+    except urllib.error.HTTPError as e:
+        response = e
+    with response:
+        yield response.status, response.headers, iter(lambda: response.read(65536), b"")
+
+def _range_start(content_range):
+    """First byte of a "bytes a-b/n" Content-Range, or None."""
+    try:
+        return int(content_range.split()[1].split("-")[0])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
 class InstallerWorker(QObject):
-    """Worker thread for downloading and installing updates."""
+    """Worker thread for downloading and installing updates.
+
+    Resumes the download with HTTP Range + If-Range into a .part file named after the
+    URL (so a partial download of another release is never spliced in), verifies the whole
+    package's SHA-256 (sidecar "<url>.sha256" or "<url>.manifest.json") before
+    touching anything, then replaces only the files whose hash differs, streaming
+    each entry from the archive into an atomic temp file.
+    """
     finished = pyqtSignal(bool, str)
     progress = pyqtSignal(int)
     status = pyqtSignal(str)
@@ -173,66 +484,47 @@ class InstallerWorker(QObject):
 
     def run(self):
         temp_zip = "pending_update.zip"
-        ext_dir = "update_temp_extracted"
+        # Un .part por URL (la URL incluye la versión): los de otras versiones se descartan.
+        part = f"pending_update-{hashlib.sha256(self.url.encode()).hexdigest()[:12]}.zip.part"
+        for stale in glob.glob("pending_update*.zip.part*"):
+            if not stale.startswith(part):
+                try: os.remove(stale)
+                except OSError: pass
         try:
             self.status.emit("Conectando con el servidor...")
-            
-            if requests:
-                r = requests.get(self.url, stream=True)
-                total = int(r.headers.get("content-length", 0))
-                down = 0
-                with open(temp_zip, "wb") as f:
-                    for chunk in r.iter_content(8192):
-                        if not self._running: return
-                        f.write(chunk)
-                        down += len(chunk)
-                        if total: self.progress.emit(int(down * 100 / total))
+            expected = self._expected_hash()
+            if not self._download(part):
+                return
+            self.status.emit("Verificando integridad...")
+            if expected:
+                actual = sha256_file(part)
+                if actual != expected:
+                    # Un .part corrupto no debe reanudarse: se descarta entero.
+                    self._discard(part)
+                    raise ValueError(f"SHA-256 no coincide ({actual[:12]} != {expected[:12]})")
             else:
-                # Fallback usando urllib
-                import urllib.request
-                with urllib.request.urlopen(self.url, timeout=60) as response:
-                    total = int(response.headers.get("Content-Length", 0))
-                    down = 0
-                    with open(temp_zip, "wb") as f:
-                        while True:
-                            chunk = response.read(8192)
-                            if not chunk or not self._running: break
-                            f.write(chunk)
-                            down += len(chunk)
-                            if total: self.progress.emit(int(down * 100 / total))
-
-            self.status.emit("Descomprimiendo actualización...")
-            if os.path.exists(ext_dir): shutil.rmtree(ext_dir)
+                log("[UPDATE] Sin hash publicado; solo se comprueban los CRC del ZIP")
+                with zipfile.ZipFile(part) as z:
+                    bad = z.testzip()
+                if bad:
+                    self._discard(part)
+                    raise ValueError(f"Entrada dañada en el paquete: {bad}")
+            os.replace(part, temp_zip)
+            self._discard(part)
+
             with zipfile.ZipFile(temp_zip, "r") as z:
-                z.extractall(ext_dir)
-
-            self.status.emit("Cerrando aplicación principal...")
-            self._kill_target(self.app)
-            time.sleep(2)
-
-            self.status.emit("Sobrescribiendo sistema...")
-            for root, dirs, files in os.walk(ext_dir):
-                rel = os.path.relpath(root, ext_dir)
-                dest_fold = rel if rel != "." else "."
-                if dest_fold != "." and not os.path.exists(dest_fold):
-                    os.makedirs(dest_fold)
-                for file in files:
-                    src = os.path.join(root, file)
-                    dst = os.path.join(dest_fold, file)
-                    if os.path.abspath(dst) == os.path.abspath(sys.argv[0]): continue
-                    if os.path.exists(dst):
-                        try: os.remove(dst)
-                        except:
-                            try: os.rename(dst, dst + f".old.{int(time.time())}")
-                            except: continue
-                    try: shutil.move(src, dst)
-                    except: pass
-
-            # Sincronizar plantillas
-            self._sync_templates()
-
-            try: shutil.rmtree(ext_dir)
-            except: pass
+                self.status.emit("Comparando archivos...")
+                changed = self._plan(z)
+                log(f"[UPDATE] {len(changed)} archivos cambiados")
+                if changed:
+                    self.status.emit("Cerrando aplicación principal...")
+                    self._kill_target(self.app)
+                    time.sleep(2)
+                    self.status.emit(f"Actualizando {len(changed)} archivos...")
+                    for i, (info, dst) in enumerate(changed, 1):
+                        self._replace(z, info, dst)
+                        self.progress.emit(90 + int(10 * i / len(changed)))
+
             try: os.remove(temp_zip)
             except: pass
             
@@ -243,6 +535,141 @@ class InstallerWorker(QObject):
             log(traceback.format_exc())
             self.finished.emit(False, str(e))
 
+    def _fetch_text(self, url):
+        try:
+            if requests:
+                r = get_session().get(url, timeout=10)
+                return r.text if r.status_code == 200 else None
+            import urllib.request
+            with urllib.request.urlopen(url, timeout=10) as response:
+                return response.read().decode("utf-8")
+        except: return None
+
+    def _expected_hash(self):
+        """Package SHA-256 from a "<url>.sha256" sidecar or "<url>.manifest.json", if published."""
+        text = self._fetch_text(self.url + ".sha256")
+        if text and text.split():
+            return text.split()[0].lower()
+        text = self._fetch_text(self.url + ".manifest.json")
+        if text:
+            try: return json.loads(text).get("sha256", "").lower() or None
+            except ValueError: pass
+        return None
+
+    def _discard(self, part):
+        """Remove part and its validator sidecar."""
+        for path in (part, part + ".json"):
+            try: os.remove(path)
+            except OSError: pass
+
+    def _download(self, part):
+        """Download into part, resuming only if the server confirms it is the same file.
+
+        The validator (strong ETag or Last-Modified) of the response that started part is
+        kept in "<part>.json" and sent as If-Range: if the file changed, the server answers
+        200 with the whole body and part starts over. Returns False if cancelled.
+        """
+        have = os.path.getsize(part) if os.path.exists(part) else 0
+        validator = None
+        if have:
+            try:
+                with open(part + ".json", encoding="utf-8") as f:
+                    validator = json.load(f).get("validator")
+            except (OSError, ValueError, AttributeError):
+                validator = None
+            if not validator:
+                log("[UPDATE] .part sin validador; descarga desde cero")
+                have = 0
+        headers = {"Range": f"bytes={have}-", "If-Range": validator} if have else {}
+        with _abrir_descarga(self.url, headers) as (status, resp_headers, chunks):
+            if status == 416:
+                # El .part ya está completo (o es mayor que el archivo): se valida tal cual.
+                return True
+            if status not in (200, 206):
+                raise IOError(f"HTTP {status} descargando {self.url}")
+            if status == 206 and _range_start(resp_headers.get("Content-Range")) != have:
+                self._discard(part)
+                raise IOError("Respuesta de rango inesperada; se reintentará desde cero")
+            if status == 200:
+                if have:
+                    log("[UPDATE] El archivo cambió o el servidor no admite Range; descarga desde cero")
+                have = 0
+                etag = resp_headers.get("ETag")
+                # If-Range solo admite ETags fuertes.
+                validator = etag if etag and not etag.startswith("W/") else resp_headers.get("Last-Modified")
+                with open(part + ".json", "w", encoding="utf-8") as f:
+                    json.dump({"url": self.url, "validator": validator}, f)
+            total = int(resp_headers.get("Content-Length", 0)) + have
+            down = have
+            with open(part, "ab" if status == 206 else "wb") as f:
+                for chunk in chunks:
+                    if not self._running: return False
+                    f.write(chunk)
+                    down += len(chunk)
+                    if total: self.progress.emit(int(down * 85 / total))
+        if total and down < total:
+            raise IOError(f"Descarga incompleta ({down}/{total} bytes); se reanudará en el próximo intento")
+        return True
+
+    def _plan(self, z):
+        """Entries whose content differs from the installed file: [(ZipInfo, destination)]."""
+        manifest = {}
+        if "manifest.json" in z.namelist():
+            try: manifest = json.loads(z.read("manifest.json")).get("files", {})
+            except ValueError: manifest = {}
+        this_script = os.path.abspath(sys.argv[0])
+        changed = []
+        entries = [info for info in z.infolist() if not info.is_dir()]
+        for i, info in enumerate(entries, 1):
+            dst = _safe_target(info.filename)
+            if dst is None:
+                log(f"[UPDATE] Entrada ignorada (ruta fuera del destino): {info.filename}")
+                continue
+            if dst == this_script: continue
+            if os.path.exists(dst):
+                # El manifiesto evita descomprimir; sin él se calcula el hash de la entrada en streaming.
+                new_hash = manifest.get(info.filename) or self._entry_hash(z, info)
+                if new_hash == sha256_file(dst):
+                    continue
+            changed.append((info, dst))
+            self.progress.emit(85 + int(5 * i / len(entries)))
+        return changed
+
+    def _entry_hash(self, z, info):
+        h = hashlib.sha256()
+        with z.open(info) as src:
+            for block in iter(lambda: src.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def _replace(self, z, info, dst):
+        """Stream one entry into a temp file beside dst and swap it in atomically."""
+        folder = os.path.dirname(dst)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".update-", suffix=".tmp")
+        try:
+            # mkstemp crea 0600: se conserva el modo instalado (ejecutables incluidos); un archivo
+            # nuevo recibe el de open() con la umask actual, más +x si el ZIP lo marca ejecutable.
+            if os.path.exists(dst):
+                mode = stat.S_IMODE(os.stat(dst).st_mode)
+            else:
+                mode = _default_mode()
+                if (info.external_attr >> 16) & stat.S_IXUSR:
+                    mode |= (mode & 0o444) >> 2
+            os.chmod(tmp, mode)
+            with os.fdopen(fd, "wb") as out, z.open(info) as src:
+                shutil.copyfileobj(src, out, 1 << 20)
+            try:
+                os.replace(tmp, dst)
+            except OSError:
+                # Windows: un ejecutable en uso no se puede sobrescribir, pero sí renombrar.
+                os.rename(dst, dst + f".old.{int(time.time())}")
+                os.replace(tmp, dst)
+        except Exception:
+            try: os.remove(tmp)
+            except: pass
+            raise
+
     def _kill_target(self, target_name):
         """Kill processes by name."""
         log(f"Matando procesos de: {target_name}")
@@ -255,23 +682,6 @@ class InstallerWorker(QObject):
         except Exception as e:
             log(f"Kill error: {e}")
 
-    def _sync_templates(self):
-        """Sync templates from extracted update."""
-        src = os.path.join("update_temp_extracted", "src", "templates")
-        tgt = os.path.join("src", "templates")
-        if os.path.isdir(src):
-            try:
-                for root, dirs, files in os.walk(src):
-                    for file in files:
-                        src_file = os.path.join(root, file)
-                        rel = os.path.relpath(src_file, src)
-                        tgt_file = os.path.join(tgt, rel)
-                        os.makedirs(os.path.dirname(tgt_file), exist_ok=True)
-                        shutil.copy2(src_file, tgt_file)
-                log("[TEMPLATE SYNC] Plantillas sincronizadas")
-            except Exception as e:
-                log(f"[TEMPLATE SYNC] Error: {e}")
-
 class ModernUpdaterWindow(QMainWindow):
     """Main updater window with modern UI."""
     
@@ -361,21 +771,24 @@ class ModernUpdaterWindow(QMainWindow):
 def ciclo_embestido():
     """Background update checker."""
     def verificar():
+        scheduler = PollScheduler()
+        pendiente = None
         while True:
             datos = leer_xml(XML_PATH)
+            estado, retry_after = "not_modified", None
             if datos:
-                remoto = leer_xml_remoto(datos["author"], datos["app"])
-                if remoto and remoto != datos["version"]:
-                    # Buscar .exe primero, luego .iflapp
-                    exe_url, exe_file = buscar_release_exe(
-                        datos["author"], datos["app"], remoto,
-                        datos["platform"], datos["publisher"]
-                    )
+                estado, remoto, retry_after = consultar_xml_remoto(datos["author"], datos["app"])
+                # Un 304 trae la versión del caché: tras reiniciar, sigue siendo una actualización pendiente.
+                if estado in ("changed", "not_modified") and remoto and remoto != datos["version"]:
+                    pendiente = remoto
+                elif estado == "rate_limited":
+                    log(f"[POLL] Límite de peticiones; reintento en {retry_after or 'backoff'} s")
+                if pendiente and pendiente != datos["version"]:
+                    # Buscar .exe y .iflapp con una sola consulta de assets
+                    exe_url, exe_file, url, estado_release, espera = buscar_actualizacion(datos, pendiente)
                     if exe_url:
-                        log(f"[UPDATE] Nueva versión disponible: {remoto}")
+                        log(f"[UPDATE] Nueva versión disponible: {pendiente}")
                         # Por ahora solo .iflapp para descarga directa
-                    
-                    url = buscar_release(datos["author"], datos["app"], remoto, datos["platform"], datos["publisher"])
                     if url:
                         if PYQT6_AVAILABLE:
                             app = QApplication(sys.argv)
@@ -383,7 +796,11 @@ def ciclo_embestido():
                             w.show()
                             app.exec()
                         return 
-            time.sleep(CHECK_INTERVAL)
+                    # Release incompleto o API agotada: mismo backoff que un 429, así no se consulta
+                    # la API de GitHub en cada ciclo hasta que se publique el .iflapp.
+                    log(f"[UPDATE] {pendiente} aún no descargable ({estado_release})")
+                    estado, retry_after = estado_release, espera
+            time.sleep(scheduler.next_delay(estado, retry_after))
     threading.Thread(target=verificar, daemon=True).start()
 
 if __name__ == "__main__":